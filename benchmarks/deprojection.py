@@ -0,0 +1,93 @@
+"""
+Benchmark comparing the accuracy and speed of de-projecting sub-pixel tracks against the previous
+integer coordinate path, which truncated interpolated coordinates to whole pixels.
+
+Run with `python benchmarks/deprojection.py`.
+"""
+
+import time
+
+import numpy as np
+
+from disc_tracker.deprojection.disc_track import (
+    DiscTrack,
+    align_tracks,
+    deproject_points,
+)
+
+N_FRAMES = 100_000
+N_REPEATS = 5
+CAMERA_SETTINGS = {"resolution": [1280, 720], "f": 1089.4, "d": 4, "c": 1.8, "h": 2.8}
+
+
+def synthetic_tracks() -> tuple:
+    """
+    Project a disc flying away from the cameras into each camera, dropping random frames.
+
+    Returns the true 3D path and the (t, x, y) detections of each camera.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(N_FRAMES, dtype=np.float64)
+    phase = 2 * np.pi * t / 500
+    X = 5 * np.sin(phase)
+    Y = 20 + 15 * np.sin(phase / 3)  # 5-35 m from the cameras
+    Z = 1 + 0.5 * np.cos(phase)
+    d, f = CAMERA_SETTINGS["d"], CAMERA_SETTINGS["f"]
+    centre = np.array(CAMERA_SETTINGS["resolution"]) / 2
+    y_image = f * (CAMERA_SETTINGS["h"] - Z) / (Y + CAMERA_SETTINGS["c"]) + centre[1]
+    tracks = []
+    for offset in (d / 2, -d / 2):
+        x_image = f * (X + offset) / (Y + CAMERA_SETTINGS["c"]) + centre[0]
+        detected = rng.random(N_FRAMES) > 0.1
+        tracks.append((t[detected], np.column_stack([x_image, y_image])[detected]))
+    return (X, Y, Z), tracks
+
+
+def integer_path(tracks: list, time_index: np.ndarray) -> tuple:
+    """
+    Previous implementation, truncating to whole pixels and centring with an integer shift.
+    """
+    aligned = []
+    for t, coordinates in tracks:
+        aligned.append(
+            [
+                np.interp(time_index, t, coordinates[:, i]).astype(np.int64)
+                - int(CAMERA_SETTINGS["resolution"][i] / 2)
+                for i in range(2)
+            ]
+        )
+    (xl, zl), (xr, zr) = aligned
+    return deproject_points(xl, xr, zl, zr, CAMERA_SETTINGS)
+
+
+def float_path(tracks: list, time_index: np.ndarray) -> tuple:
+    """
+    Current implementation, keeping sub-pixel coordinates.
+    """
+    left, right = align_tracks(tracks, time_index, CAMERA_SETTINGS["resolution"])
+    (xl, zl), (xr, zr) = left, right
+    return deproject_points(xl, xr, zl, zr, CAMERA_SETTINGS)
+
+
+def main() -> None:
+    truth, tracks = synthetic_tracks()
+    time_index = DiscTrack.get_time_index(tracks[0][0], tracks[1][0])
+    truth = np.column_stack(truth)[time_index.astype(np.int64)]
+
+    print(f"{len(time_index)} frames, depth 5-35 m")
+    print(f"{'':<10}{'ms':>8}{'RMS error (m)':>16}{'max depth error (m)':>22}")
+    for name, path in [("integer", integer_path), ("float", float_path)]:
+        timings = []
+        for _ in range(N_REPEATS):
+            start = time.perf_counter()
+            result = np.column_stack(path(tracks, time_index))
+            timings.append(1000 * (time.perf_counter() - start))
+        error = result - truth
+        rms = np.sqrt(np.mean(np.sum(error**2, axis=1)))
+        print(
+            f"{name:<10}{min(timings):8.2f}{rms:16.3f}{np.max(np.abs(error[:, 1])):22.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark comparing per-frame detection with `gg6.detect_objects` against `FrameProcessor`.
+
+Each measurement runs in a fresh process, and the configurations being compared take turns, so
+differences in memory layout and machine load between runs affect them equally. The median of
+the rounds is reported.
+
+Run with `python benchmarks/frame_processor.py`.
+"""
+
+import multiprocessing
+import statistics
+import time
+
+import cv2 as cv
+import numpy as np
+
+from disc_tracker.video_processing import gg6
+from disc_tracker.video_processing.frame_processor import FrameProcessor
+
+N_FRAMES = 100
+N_ROUNDS = 5
+RESOLUTION = (1280, 720)
+
+
+def synthetic_frames(n_frames: int, n_idle: int = 0) -> list[np.ndarray]:
+    """
+    Create noisy frames with a disc moving across them, after `n_idle` frames with no disc.
+    """
+    rng = np.random.default_rng(0)
+    width, height = RESOLUTION
+    frames = []
+    for i in range(n_idle):
+        frames.append(rng.integers(30, 50, (height, width, 3), dtype=np.uint8))
+    for i in range(n_frames):
+        frame = rng.integers(30, 50, (height, width, 3), dtype=np.uint8)
+        centre = (50 + 5 * i, height // 2 - int(200 * np.sin(np.pi * i / n_frames)))
+        cv.circle(frame, centre, 8, (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def create_detect_objects():
+    """
+    Per-frame detection using the functional API, which allocates kernels and masks every frame.
+    """
+    background_subtractor = cv.createBackgroundSubtractorMOG2()
+    blob_detector = gg6.setup_blob_detector()
+    return lambda frame: gg6.detect_objects(background_subtractor, blob_detector, frame)
+
+
+# Functions creating the per-frame detection of each configuration, by name
+DETECTORS = {
+    "detect_objects": create_detect_objects,
+    "FrameProcessor": lambda: FrameProcessor().detect,
+    "FrameProcessor(fast_close=True)": lambda: FrameProcessor(fast_close=True).detect,
+    "FrameProcessor(scale=0.5)": lambda: FrameProcessor(scale=0.5).detect,
+    "FrameProcessor(motion_gate=True)": lambda: FrameProcessor(motion_gate=True).detect,
+}
+
+
+def time_per_frame(name: str, n_idle: int) -> float:
+    """
+    Average time in milliseconds to detect objects in each frame, in the current process.
+    """
+    frames = synthetic_frames(N_FRAMES - n_idle, n_idle)
+    detect = DETECTORS[name]()
+    start = time.perf_counter()
+    for frame in frames:
+        detect(frame)
+    return 1000 * (time.perf_counter() - start) / len(frames)
+
+
+def compare(names: list[str], n_idle: int = 0) -> dict[str, float]:
+    """
+    Median time per frame of each configuration, measuring each in a fresh process in turn.
+    """
+    context = multiprocessing.get_context("spawn")
+    timings = {name: [] for name in names}
+    for _ in range(N_ROUNDS):
+        for name in names:
+            with context.Pool(1) as pool:
+                timings[name].append(pool.apply(time_per_frame, (name, n_idle)))
+    return {name: statistics.median(t) for name, t in timings.items()}
+
+
+def report(title: str, results: dict[str, float]) -> None:
+    print(f"\n{title}")
+    baseline = next(iter(results.values()))
+    for name, ms in results.items():
+        print(f"{name:<45}{ms:8.2f} ms/frame {ms / baseline:6.2f}x")
+
+
+def main() -> None:
+    print(
+        f"{N_FRAMES} frames at {RESOLUTION[0]}x{RESOLUTION[1]}, median of {N_ROUNDS} runs"
+    )
+
+    # Same kernels, so the same detections, only reusing the kernels and buffers and searching
+    # less of the mask for blobs
+    report(
+        "Cached kernels, reused buffers and cropped blob search",
+        compare(["detect_objects", "FrameProcessor"]),
+    )
+    # A rectangular closing kernel is faster but changes the detections
+    report(
+        "Closing kernel",
+        compare(["FrameProcessor", "FrameProcessor(fast_close=True)"]),
+    )
+    report(
+        "Resolution",
+        compare(["FrameProcessor", "FrameProcessor(scale=0.5)"]),
+    )
+    # Most of a recording is idle before and after the throw
+    report(
+        "Motion gate, 75% of frames without motion",
+        compare(
+            ["FrameProcessor", "FrameProcessor(motion_gate=True)"],
+            n_idle=3 * N_FRAMES // 4,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
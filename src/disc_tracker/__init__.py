@@ -1,7 +1,18 @@
 import argparse
 import os
+import sys
+from collections.abc import Container
+from concurrent.futures import ProcessPoolExecutor
 
+from disc_tracker import batch, calibrate
+from disc_tracker.track_store import TrackStore, session_name
 from disc_tracker.video_processing import gg6
+from disc_tracker.video_processing.archive import TrackArchive, save_track_archive
+from disc_tracker.video_processing.disc_identification import (
+    identify_disc,
+    score_objects,
+    score_tracks,
+)
 from disc_tracker.deprojection.plot import PlotlyPlot, MatplotlibPlot
 
 PLOT_CLASS = {
@@ -10,37 +21,188 @@ PLOT_CLASS = {
 }
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        prog="Disc Tracker",
-        description="Using video from two parallel cameras, reconstruct the 3D path of a disc.",
-    )
+def select_disc(
+    chanel: str, scores: dict[int, float], auto_id: bool, ids: Container[int]
+) -> list[int]:
+    """
+    Choose the ids of the objects which are the disc, suggesting the most disc-like object.
+
+    The user is asked again until they give at least one valid id, or accept the suggestion.
+
+    Args:
+        chanel (str): Name of video chanel.
+        scores (dict[int, float]): How disc-like each object is.
+        auto_id (bool): Use the suggested object without asking the user.
+        ids (Container[int]): IDs of every tracked object.
+
+    Returns:
+        list[int]: IDs of the disc, in order of preference.
+    """
+    suggested_id = identify_disc(scores)
+    if auto_id:
+        if suggested_id is None:
+            exit(f"No disc found in {chanel} chanel")
+        print(f"Disc in {chanel} chanel: {suggested_id}")
+        return [suggested_id]
+
+    while True:
+        try:
+            response = input(
+                f"Enter id(s) of disc in {chanel} chanel (suggested: {suggested_id}): "
+            )
+        except EOFError:
+            exit(f"No disc id given for {chanel} chanel")
+        if response.strip() == "" and suggested_id is not None:
+            return [suggested_id]
+        try:
+            disc_ids = [int(id) for id in response.replace(",", " ").split()]
+        except ValueError:
+            print("Ids must be whole numbers, e.g. `3` or `3 17`")
+            continue
+        unknown = [id for id in disc_ids if id not in ids]
+        if unknown:
+            print(f"No object with id {', '.join(map(str, unknown))}")
+        elif disc_ids:
+            return disc_ids
+        else:
+            print("No object was suggested, enter at least one id")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the command line options for tracking a single dataset.
+
+    Args:
+        parser (ArgumentParser): Parser to add the options to.
+    """
     parser.add_argument("directory")
     parser.add_argument(
         "-p", "--plot-method", default="plotly", choices=["plotly", "mpl", "mlab"]
     )
     parser.add_argument("-plot_only", action="store_true")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Track objects without displaying the video.",
+    )
+    parser.add_argument(
+        "--save-video",
+        action="store_true",
+        help="Write the annotated video for each chanel to the tracks directory.",
+    )
+    gg6.add_tracking_arguments(parser)
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Save the tracks of every object, so the disc can be reselected without re-tracking.",
+    )
+    parser.add_argument(
+        "--select-only",
+        action="store_true",
+        help="Select the disc from previously archived tracks instead of tracking.",
+    )
+    parser.add_argument(
+        "--auto-id",
+        action="store_true",
+        help="Select the most disc-like object without asking for its id.",
+    )
+    parser.add_argument(
+        "--store",
+        help="Also append the disc tracks to the track store in this directory.",
+    )
+
 
-    args = parser.parse_args()
+def track(args: argparse.Namespace) -> None:
+    """
+    Track the disc in a single dataset and plot its 3D path.
 
+    Args:
+        args (Namespace): Options parsed by a parser set up with `add_arguments`.
+    """
     print("*" * 64)
     print("Disc Tracker".center(64))
     print("*" * 64)
     print(f"Directory: {args.directory}")
     print(f"Plotting method: {args.plot_method}")
     print(f"Plot only: {args.plot_only}")
+    print(f"Headless: {args.headless}")
 
-    if not args.plot_only:
-        tracks_directory = os.path.join(args.directory, "tracks")
+    tracks_directory = os.path.join(args.directory, "tracks")
+    store = None if args.store is None else TrackStore(args.store)
+    session = session_name(args.directory)
+    if args.select_only:
+        for chanel in gg6.CHANELS:
+            archive = TrackArchive(os.path.join(tracks_directory, f"{chanel}.tracks"))
+            disc_ids = select_disc(
+                chanel,
+                score_tracks(archive.tracks(), archive.mean_sizes()),
+                args.auto_id,
+                archive,
+            )
+            archive.save_disc_track(
+                os.path.join(tracks_directory, f"{chanel}.npz"),
+                disc_ids,
+                store=store,
+                key=(session, chanel),
+            )
+    elif not args.plot_only:
         # Create tracks directory if one doesn't exist
         os.makedirs(tracks_directory, exist_ok=True)
-        for chanel in ["left", "right"]:
-            video = gg6.load_video(args.directory, chanel)
-            print(f"\nTracking objects for {chanel} chanel...")
-            tracks = gg6.track_objects(video, chanel)
-            disc_id = int(input(f"Enter id of disc in {chanel} chanel: "))
+        options = gg6.tracking_options(args)
+        if options["segments"] > 1:
+            # Share the CPUs between the chanels' segment workers
+            options["segment_workers"] = max(
+                1, (os.cpu_count() or 1) // len(gg6.CHANELS)
+            )
+        output_filenames = {chanel: None for chanel in gg6.CHANELS}
+        if args.save_video:
+            output_filenames = {
+                chanel: os.path.join(tracks_directory, f"{chanel}.mp4")
+                for chanel in gg6.CHANELS
+            }
+        if args.headless:
+            # The chanels are independent until deprojection, so track them concurrently
+            with ProcessPoolExecutor(max_workers=len(gg6.CHANELS)) as executor:
+                futures = {
+                    chanel: executor.submit(
+                        gg6.track_chanel,
+                        args.directory,
+                        chanel,
+                        headless=True,
+                        output_filename=output_filenames[chanel],
+                        **options,
+                    )
+                    for chanel in gg6.CHANELS
+                }
+                tracks = {chanel: future.result() for chanel, future in futures.items()}
+        else:
+            # HighGUI windows and key presses only work reliably from the main process, so
+            # the chanels are displayed and tracked one after another
+            tracks = {
+                chanel: gg6.track_chanel(
+                    args.directory,
+                    chanel,
+                    headless=False,
+                    output_filename=output_filenames[chanel],
+                    **options,
+                )
+                for chanel in gg6.CHANELS
+            }
+
+        for chanel in gg6.CHANELS:
+            if args.archive:
+                save_track_archive(
+                    os.path.join(tracks_directory, f"{chanel}.tracks"), tracks[chanel]
+                )
+            disc_ids = select_disc(
+                chanel, score_objects(tracks[chanel]), args.auto_id, tracks[chanel]
+            )
             gg6.save_disc_track(
-                os.path.join(tracks_directory, f"{chanel}.npz"), tracks, disc_id
+                os.path.join(tracks_directory, f"{chanel}.npz"),
+                tracks[chanel],
+                disc_ids,
+                store=store,
+                key=(session, chanel),
             )
 
     print("\nPlotting results...")
@@ -48,3 +210,39 @@ def main() -> None:
     track_plot.save_figure()
     track_plot.show_figure()
     print("Done!")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="disc_tracker",
+        description="Using video from two parallel cameras, reconstruct the 3D path of a disc.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_arguments(
+        subparsers.add_parser(
+            "track",
+            help="Track the disc in a dataset and plot its path (the default).",
+            description="Using video from two parallel cameras, reconstruct the 3D path of a disc.",
+        )
+    )
+    batch.add_arguments(
+        subparsers.add_parser(
+            "batch",
+            help="Track the disc in every dataset below a root directory.",
+            description="Track the disc in every session directory below a root directory.",
+        )
+    )
+    calibrate.add_arguments(
+        subparsers.add_parser(
+            "calibrate",
+            help="Calibrate both cameras from videos of a checkerboard.",
+            description="Calibrate both cameras from videos of a checkerboard.",
+        )
+    )
+
+    argv = sys.argv[1:] if argv is None else argv
+    # Tracking is the default, so `disc_tracker <directory>` works without naming the command
+    if argv and argv[0] not in subparsers.choices and argv[0] not in ("-h", "--help"):
+        argv = ["track", *argv]
+    args = parser.parse_args(argv)
+    {"track": track, "batch": batch.run, "calibrate": calibrate.run}[args.command](args)
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from disc_tracker.track_store import TrackStore, append_session, session_name
+from disc_tracker.video_processing import gg6
+from disc_tracker.video_processing.archive import save_track_archive
+from disc_tracker.video_processing.disc_identification import (
+    identify_disc,
+    score_objects,
+)
+
+MANIFEST_FILENAME = "batch_manifest.json"
+
+
+def session_inputs(directory: str) -> list[str]:
+    """
+    List the files a session's tracks are computed from.
+
+    Args:
+        directory (str): Path to the session directory.
+
+    Returns:
+        list[str]: Paths of the input files. The regions of interest are only included if they exist.
+    """
+    inputs = [
+        os.path.join(directory, "video", f"{chanel}.mp4") for chanel in gg6.CHANELS
+    ]
+    inputs.append(os.path.join(directory, "camera_settings.yaml"))
+    for chanel in gg6.CHANELS:
+        roi = os.path.join(directory, "roi", f"{chanel}.png")
+        if os.path.exists(roi):
+            inputs.append(roi)
+    return inputs
+
+
+def session_outputs(directory: str) -> list[str]:
+    """
+    List the track files written for a session.
+
+    Args:
+        directory (str): Path to the session directory.
+
+    Returns:
+        list[str]: Paths of the output files.
+    """
+    return [
+        os.path.join(directory, "tracks", f"{chanel}.npz") for chanel in gg6.CHANELS
+    ]
+
+
+def discover_sessions(root: str) -> list[str]:
+    """
+    Find every session directory below the root directory.
+
+    A session directory contains `camera_settings.yaml` and a `video` sub-directory with a video for
+    each chanel.
+
+    Args:
+        root (str): Directory to search.
+
+    Returns:
+        list[str]: Paths of the session directories, sorted.
+    """
+    sessions = []
+    for directory, subdirectories, _ in os.walk(root):
+        if all(os.path.exists(path) for path in session_inputs(directory)):
+            sessions.append(directory)
+            # Sessions aren't nested
+            subdirectories.clear()
+    return sorted(sessions)
+
+
+def is_up_to_date(directory: str) -> bool:
+    """
+    Check whether a session's tracks are newer than all of its inputs.
+
+    Args:
+        directory (str): Path to the session directory.
+
+    Returns:
+        bool: Whether the session can be skipped.
+    """
+    outputs = session_outputs(directory)
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+
+    newest_input = max(os.path.getmtime(path) for path in session_inputs(directory))
+    return min(os.path.getmtime(path) for path in outputs) > newest_input
+
+
+def process_session(directory: str, archive: bool = False, **options) -> dict:
+    """
+    Track the objects in both chanels of a session and save the track of the disc.
+
+    Errors are caught and reported in the result, so one bad session doesn't stop a batch.
+
+    Args:
+        directory (str): Path to the session directory.
+        archive (bool, optional): Also save the tracks of every object. Defaults to False.
+        **options: Keyword arguments for `gg6.track_chanel`.
+
+    Returns:
+        dict: Summary of the session, its status, timing and the ids of the disc.
+    """
+    start = time.perf_counter()
+    result = {"session": directory, "status": "done", "disc_ids": {}, "error": None}
+    tracks_directory = os.path.join(directory, "tracks")
+    try:
+        os.makedirs(tracks_directory, exist_ok=True)
+        for chanel in gg6.CHANELS:
+            tracks = gg6.track_chanel(directory, chanel, headless=True, **options)
+            if archive:
+                save_track_archive(
+                    os.path.join(tracks_directory, f"{chanel}.tracks"), tracks
+                )
+            disc_id = identify_disc(score_objects(tracks))
+            if disc_id is None:
+                raise ValueError(f"No disc found in {chanel} chanel")
+            gg6.save_disc_track(
+                os.path.join(tracks_directory, f"{chanel}.npz"), tracks, disc_id
+            )
+            result["disc_ids"][chanel] = disc_id
+    # `load_video` exits if a video can't be opened
+    except (Exception, SystemExit) as error:
+        result["status"] = "failed"
+        result["error"] = str(error)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    root: str,
+    workers: int | None = None,
+    force: bool = False,
+    archive: bool = False,
+    store: str | None = None,
+    **options,
+) -> list[dict]:
+    """
+    Process every session below the root directory over a pool of worker processes.
+
+    A manifest summarising each session is written to `batch_manifest.json` in the root directory.
+
+    Args:
+        root (str): Directory containing the sessions.
+        workers (int, optional): Number of worker processes. Defaults to None (one per CPU, or one
+            if each session is split into segments, which are tracked in parallel themselves).
+        force (bool, optional): Process sessions even if their tracks are up to date. Defaults to False.
+        archive (bool, optional): Also save the tracks of every object. Defaults to False.
+        store (str, optional): Directory of a track store to append the disc tracks of each session
+            to, named by `session_name`. Skipped sessions are added if they aren't in it yet.
+            Defaults to None.
+        **options: Keyword arguments for `gg6.track_chanel`.
+
+    Returns:
+        list[dict]: Summary of each session.
+    """
+    if options.get("segments", 1) > 1:
+        # Segments already use every CPU, more sessions at once would oversubscribe them
+        if workers is not None and workers > 1:
+            raise ValueError(
+                "Sessions split into segments can't be processed in parallel"
+            )
+        workers = 1
+    started = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    sessions = discover_sessions(root)
+    results = {}
+    pending = []
+    for session in sessions:
+        if not force and is_up_to_date(session):
+            results[session] = {
+                "session": session,
+                "status": "skipped",
+                "disc_ids": {},
+                "error": None,
+                "seconds": 0.0,
+            }
+        else:
+            pending.append(session)
+    print(f"Found {len(sessions)} sessions, {len(pending)} to process")
+    track_store = None if store is None else TrackStore(store)
+    if track_store is not None:
+        for session in sessions:
+            # Sessions processed before the store was used still need adding
+            missing = any(
+                (session_name(session), chanel) not in track_store
+                for chanel in gg6.CHANELS
+            )
+            if results.get(session, {}).get("status") == "skipped" and missing:
+                append_session(track_store, session, gg6.CHANELS)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_session, session, archive=archive, **options)
+            for session in pending
+        ]
+        for future in futures:
+            result = future.result()
+            results[result["session"]] = result
+            # Only this process writes to the store, so appends don't interleave
+            if track_store is not None and result["status"] == "done":
+                append_session(track_store, result["session"], gg6.CHANELS)
+            print(
+                f"{result['session']}: {result['status']} in {result['seconds']:.1f}s"
+            )
+
+    summary = [results[session] for session in sessions]
+    manifest = {
+        "root": root,
+        "started": started,
+        "seconds": time.perf_counter() - start,
+        "options": {
+            "workers": workers,
+            "force": force,
+            "archive": archive,
+            "store": store,
+            **options,
+        },
+        "sessions": summary,
+    }
+    with open(os.path.join(root, MANIFEST_FILENAME), "w") as file:
+        json.dump(manifest, file, indent=2)
+
+    return summary
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the command line options for the `batch` sub-command.
+
+    Args:
+        parser (ArgumentParser): Parser to add the options to.
+    """
+    parser.add_argument("root")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of sessions to process at once. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Process sessions even if their tracks are newer than their inputs.",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Save the tracks of every object in each session.",
+    )
+    parser.add_argument(
+        "--store",
+        help="Also append the disc tracks of each session to the track store in this directory.",
+    )
+    gg6.add_tracking_arguments(parser)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Process every session below the root directory and print a summary.
+
+    Args:
+        args (Namespace): Options parsed by a parser set up with `add_arguments`.
+    """
+    summary = run_batch(
+        args.root,
+        workers=args.workers,
+        force=args.force,
+        archive=args.archive,
+        store=args.store,
+        **gg6.tracking_options(args),
+    )
+    counts = {status: 0 for status in ["done", "skipped", "failed"]}
+    for result in summary:
+        counts[result["status"]] += 1
+    print("Done! " + ", ".join(f"{n} {status}" for status, n in counts.items()))
+    for result in summary:
+        if result["status"] != "failed":
+            continue
+        print(f"  {result['session']}: {result['error']}")
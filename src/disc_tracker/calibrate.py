@@ -0,0 +1,65 @@
+import argparse
+import itertools
+import os
+
+from disc_tracker.deprojection.calibration import calibrate_stereo, save_calibration
+from disc_tracker.video_processing import gg6
+
+CALIBRATION_FILENAME = "stereo_calibration.yaml"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the command line options for the `calibrate` sub-command.
+
+    Args:
+        parser (ArgumentParser): Parser to add the options to.
+    """
+    parser.add_argument(
+        "directory", help="Directory containing `video/left.mp4` and `video/right.mp4`."
+    )
+    parser.add_argument(
+        "--pattern",
+        type=int,
+        nargs=2,
+        default=(9, 6),
+        metavar=("COLUMNS", "ROWS"),
+        help="Number of inner corners along each side of the checkerboard.",
+    )
+    parser.add_argument(
+        "--square-size",
+        type=float,
+        default=0.025,
+        help="Side length of the checkerboard squares in meters.",
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=15,
+        help="Use every n-th frame, so the checkerboard has moved between views.",
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Calibrate both cameras and save the calibration to the directory.
+
+    Args:
+        args (Namespace): Options parsed by a parser set up with `add_arguments`.
+    """
+    videos = [gg6.load_video(args.directory, chanel) for chanel in gg6.CHANELS]
+    frame_pairs = itertools.islice(
+        zip(*(gg6.read_frames(video) for video in videos)), 0, None, args.stride
+    )
+    print("Finding checkerboard...")
+    calibration = calibrate_stereo(frame_pairs, tuple(args.pattern), args.square_size)
+    for video in videos:
+        video.release()
+
+    filename = os.path.join(args.directory, CALIBRATION_FILENAME)
+    save_calibration(filename, calibration)
+    print(
+        f"Calibrated from {calibration['views']} views, "
+        f"RMS reprojection error {calibration['rms']:.2f} pixels"
+    )
+    print(f"Saved to {filename}")
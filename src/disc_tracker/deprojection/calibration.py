@@ -0,0 +1,229 @@
+import hashlib
+import os
+from collections.abc import Iterable
+
+import cv2 as cv
+import numpy as np
+import numpy.typing as npt
+import yaml
+
+# Rectifications are cached here, so sessions filmed with the same rig only compute them once
+CACHE_DIRECTORY = os.environ.get(
+    "DISC_TRACKER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "disc_tracker"),
+)
+CALIBRATION_ARRAYS = (
+    "camera_matrix_left",
+    "distortion_left",
+    "camera_matrix_right",
+    "distortion_right",
+    "rotation",
+    "translation",
+)
+RECTIFICATION_ARRAYS = ("R1", "R2", "P1", "P2", "Q")
+
+
+def find_checkerboard(
+    frame: cv.typing.MatLike, pattern_size: tuple[int, int]
+) -> npt.NDArray[np.float32] | None:
+    """
+    Find the inner corners of a checkerboard to sub-pixel accuracy.
+
+    Args:
+        frame (MatLike): Image of the checkerboard.
+        pattern_size (tuple[int, int]): Number of inner corners along each side of the checkerboard.
+
+    Returns:
+        NDArray[float32] | None: Pixel coordinates of the corners, or None if the checkerboard wasn't found.
+    """
+    gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    found, corners = cv.findChessboardCorners(
+        gray, pattern_size, flags=cv.CALIB_CB_ADAPTIVE_THRESH | cv.CALIB_CB_FAST_CHECK
+    )
+    if not found:
+        return None
+
+    criteria = (cv.TERM_CRITERIA_EPS + cv.TERM_CRITERIA_MAX_ITER, 30, 1e-3)
+    return cv.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+
+def calibrate_stereo(
+    frame_pairs: Iterable[tuple[cv.typing.MatLike, cv.typing.MatLike]],
+    pattern_size: tuple[int, int] = (9, 6),
+    square_size: float = 0.025,
+) -> dict:
+    """
+    Calibrate the intrinsics, distortion and relative pose of both cameras from views of a checkerboard.
+
+    Args:
+        frame_pairs (Iterable[tuple[MatLike, MatLike]]): Simultaneous left and right frames.
+        pattern_size (tuple[int, int], optional): Number of inner corners along each side of the
+            checkerboard. Defaults to (9, 6).
+        square_size (float, optional): Side length of the checkerboard squares in meters. Defaults to 0.025.
+
+    Returns:
+        dict: Calibration, with the arrays in `CALIBRATION_ARRAYS` as nested lists.
+    """
+    board = np.zeros((pattern_size[0] * pattern_size[1], 3), np.float32)
+    board[:, :2] = np.mgrid[0 : pattern_size[0], 0 : pattern_size[1]].T.reshape(-1, 2)
+    board *= square_size
+
+    left_corners, right_corners = [], []
+    for left, right in frame_pairs:
+        image_size = left.shape[1::-1]
+        corners = [find_checkerboard(frame, pattern_size) for frame in (left, right)]
+        # Only views where both cameras can see the checkerboard constrain their relative pose
+        if corners[0] is not None and corners[1] is not None:
+            left_corners.append(corners[0])
+            right_corners.append(corners[1])
+    if len(left_corners) < 3:
+        raise ValueError(
+            f"Checkerboard found by both cameras in {len(left_corners)} frames, at least 3 are needed"
+        )
+
+    object_points = [board] * len(left_corners)
+    _, camera_matrix_left, distortion_left, _, _ = cv.calibrateCamera(
+        object_points, left_corners, image_size, None, None
+    )
+    _, camera_matrix_right, distortion_right, _, _ = cv.calibrateCamera(
+        object_points, right_corners, image_size, None, None
+    )
+    rms, *arrays, _, _ = cv.stereoCalibrate(
+        object_points,
+        left_corners,
+        right_corners,
+        camera_matrix_left,
+        distortion_left,
+        camera_matrix_right,
+        distortion_right,
+        image_size,
+        flags=cv.CALIB_FIX_INTRINSIC,
+    )
+
+    calibration = {
+        "resolution": list(image_size),
+        "rms": float(rms),
+        "views": len(left_corners),
+    }
+    for name, array in zip(CALIBRATION_ARRAYS, arrays):
+        calibration[name] = array.tolist()
+    return calibration
+
+
+def save_calibration(filename: str, calibration: dict) -> None:
+    """
+    Write a stereo calibration to file.
+
+    Args:
+        filename (str): Name to save the file as.
+        calibration (dict): Calibration, from `calibrate_stereo`.
+    """
+    with open(filename, "w") as file:
+        yaml.safe_dump(calibration, file, default_flow_style=None, sort_keys=False)
+
+
+def rectify(calibration: dict) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Compute the rotations and projection matrices which rectify both cameras onto a common image plane.
+
+    Args:
+        calibration (dict): Calibration, with the arrays in `CALIBRATION_ARRAYS`.
+
+    Returns:
+        dict[str, NDArray[float64]]: The arrays in `RECTIFICATION_ARRAYS`, from `cv.stereoRectify`.
+    """
+    R1, R2, P1, P2, Q, _, _ = cv.stereoRectify(
+        calibration["camera_matrix_left"],
+        calibration["distortion_left"],
+        calibration["camera_matrix_right"],
+        calibration["distortion_right"],
+        tuple(calibration["resolution"]),
+        calibration["rotation"],
+        calibration["translation"],
+        alpha=0,
+    )
+    return dict(zip(RECTIFICATION_ARRAYS, (R1, R2, P1, P2, Q)))
+
+
+def load_calibration(filename: str) -> dict:
+    """
+    Read a stereo calibration from file, along with its rectification.
+
+    The rectification is cached, keyed on the contents of the calibration file.
+
+    Args:
+        filename (str): Path to the calibration, from `save_calibration`.
+
+    Returns:
+        dict: Calibration, with the arrays in `CALIBRATION_ARRAYS` and `RECTIFICATION_ARRAYS`.
+    """
+    with open(filename, "rb") as file:
+        contents = file.read()
+    calibration = yaml.safe_load(contents)
+    for name in CALIBRATION_ARRAYS:
+        calibration[name] = np.array(calibration[name], dtype=np.float64)
+
+    cache_filename = os.path.join(
+        CACHE_DIRECTORY,
+        "rectification",
+        f"{hashlib.sha256(contents).hexdigest()}.npz",
+    )
+    if os.path.exists(cache_filename):
+        with np.load(cache_filename) as cached:
+            rectification = {name: cached[name] for name in RECTIFICATION_ARRAYS}
+    else:
+        rectification = rectify(calibration)
+        os.makedirs(os.path.dirname(cache_filename), exist_ok=True)
+        np.savez(cache_filename, **rectification)
+    calibration.update(rectification)
+
+    return calibration
+
+
+def triangulate_points(
+    xl: npt.NDArray[np.float64],
+    xr: npt.NDArray[np.float64],
+    zl: npt.NDArray[np.float64],
+    zr: npt.NDArray[np.float64],
+    camera_settings: dict,
+) -> tuple[npt.NDArray[np.float64]]:
+    """
+    Triangulate 2D coordinates, centred on the middle of each camera's image, using a calibrated rig.
+
+    Lens distortion is removed and both cameras are rectified before triangulating. The 3D
+    coordinates are given in the same frame as `deproject_points`: X along the line between the
+    cameras from their midpoint, Y away from the cameras from the back of the endzone and Z up from
+    the ground.
+
+    Args:
+        xl (NDArray[float64]): Horizontal coordinates in the left camera.
+        xr (NDArray[float64]): Horizontal coordinates in the right camera.
+        zl (NDArray[float64]): Vertical coordinates in the left camera.
+        zr (NDArray[float64]): Vertical coordinates in the right camera.
+        camera_settings (dict): Camera settings, from `read_camera_settings`, with a `calibration`.
+
+    Returns:
+        tuple[NDArray[float64]]: X, Y and Z coordinates in 3D space.
+    """
+    calibration = camera_settings["calibration"]
+    centre = np.asarray(camera_settings["resolution"], dtype=np.float64) / 2
+    rectified = []
+    for x, z, side in [(xl, zl, "left"), (xr, zr, "right")]:
+        points = np.column_stack([x, z]) + centre
+        rectified.append(
+            cv.undistortPoints(
+                points.reshape(-1, 1, 2),
+                calibration[f"camera_matrix_{side}"],
+                calibration[f"distortion_{side}"],
+                R=calibration["R1" if side == "left" else "R2"],
+                P=calibration["P1" if side == "left" else "P2"],
+            ).reshape(-1, 2)
+        )
+    homogeneous = cv.triangulatePoints(
+        calibration["P1"], calibration["P2"], rectified[0].T, rectified[1].T
+    )
+    x, y, z = homogeneous[:3] / homogeneous[3]
+
+    # Centre of the right camera in the rectified frame of the left camera
+    baseline = -calibration["P2"][0, 3] / calibration["P2"][0, 0]
+    return (x - baseline / 2, z - camera_settings["c"], camera_settings["h"] - y)
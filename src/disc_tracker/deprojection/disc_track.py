@@ -1,24 +1,126 @@
 import os
+from collections.abc import Sequence
 
 import numpy as np
 import numpy.typing as npt
 import yaml
 from numpy.lib.npyio import NpzFile
 
+from disc_tracker.deprojection.calibration import load_calibration, triangulate_points
+from disc_tracker.track_store import TrackStore, session_name
+
+
+def read_camera_settings(directory: str) -> dict:
+    """
+    Read in the camera settings from file, adding the focal length in pixels `f`.
+
+    If the settings give the path of a stereo `calibration` (relative to the directory), it is
+    loaded in place of the path.
+
+    Args:
+        directory (str): Path to directory containing `camera_settings.yaml`.
+
+    Returns:
+        dict: Camera settings.
+    """
+    with open(os.path.join(directory, "camera_settings.yaml")) as file:
+        camera_settings = yaml.safe_load(file)
+    camera_settings["f"] = (
+        camera_settings["focal_length"]
+        * camera_settings["resolution"][0]
+        / camera_settings["sensor_width"]
+    )
+    if "calibration" in camera_settings:
+        camera_settings["calibration"] = load_calibration(
+            os.path.join(directory, camera_settings["calibration"])
+        )
+    return camera_settings
+
+
+def deproject_points(
+    xl: npt.NDArray[np.float64],
+    xr: npt.NDArray[np.float64],
+    zl: npt.NDArray[np.float64],
+    zr: npt.NDArray[np.float64],
+    camera_settings: dict,
+) -> tuple[npt.NDArray[np.float64]]:
+    """
+    Deproject 2D coordinates, centred on the middle of each camera's image, into 3D space.
+
+    The cameras are assumed to be identical, parallel pinhole cameras, unless the camera settings
+    include a stereo calibration, in which case the points are triangulated with `triangulate_points`.
+
+    Args:
+        xl (NDArray[float64]): Horizontal coordinates in the left camera.
+        xr (NDArray[float64]): Horizontal coordinates in the right camera.
+        zl (NDArray[float64]): Vertical coordinates in the left camera.
+        zr (NDArray[float64]): Vertical coordinates in the right camera.
+        camera_settings (dict): Camera settings, from `read_camera_settings`.
+
+    Returns:
+        tuple[NDArray[float64]]: X, Y and Z coordinates in 3D space.
+    """
+    if "calibration" in camera_settings:
+        return triangulate_points(xl, xr, zl, zr, camera_settings)
+
+    x = 0.5 * camera_settings["d"] * (xl + xr) / (xl - xr)
+    z = -0.5 * camera_settings["d"] * (zl + zr) / (xl - xr) + camera_settings["h"]
+    y = camera_settings["d"] * camera_settings["f"] / (xl - xr) - camera_settings["c"]
+    return (x, y, z)
+
+
+def align_tracks(
+    tracks: Sequence[tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]],
+    time_index: npt.NDArray[np.float64],
+    resolution: Sequence[int],
+) -> npt.NDArray[np.float64]:
+    """
+    Interpolate the tracks from each camera onto common times, centring the coordinates on 0.
+
+    Coordinates are kept as floats, since truncating the disparity to whole pixels quantizes depth.
+
+    Args:
+        tracks (Sequence[tuple[NDArray[float64], NDArray[float64]]]): Times and (x, y) coordinates of
+            the track from each camera.
+        time_index (NDArray[float64]): Time values to interpolate for.
+        resolution (Sequence[int]): Width and height of the images in pixels.
+
+    Returns:
+        NDArray[float64]: Coordinates of each track at each time, with shape (tracks, 2, times).
+    """
+    aligned = np.empty((len(tracks), 2, len(time_index)))
+    for track, (t, coordinates) in zip(aligned, tracks):
+        for i in range(2):
+            track[i] = np.interp(time_index, t, coordinates[:, i])
+    # Centre coordinates on 0
+    aligned -= np.asarray(resolution[:2], dtype=np.float64)[:, np.newaxis] / 2
+    return aligned
+
 
 class DiscTrack:
     """
     Class for storing the disc track coordinates and deprojecting them to 3D coordinates.
     """
 
-    def __init__(self, directory: str) -> None:
+    def __init__(
+        self,
+        directory: str,
+        store: TrackStore | None = None,
+        session: str | None = None,
+    ) -> None:
         """
         Initialise class.
 
         Args:
-            directory (str): Path to directory containing `tracks` sub-directory.
+            directory (str): Path to directory containing `camera_settings.yaml` and, unless a store
+                is given, the `tracks` sub-directory.
+            store (TrackStore, optional): Store to load the tracks from. Defaults to None.
+            session (str, optional): Name of the session in the store. Defaults to None (from
+                `session_name`).
         """
         self.directory = directory
+        self.store = store
+        self.session = session or session_name(directory)
         self.read_camera_settings()
         self.read_tracks()
 
@@ -29,53 +131,43 @@ class DiscTrack:
         Returns:
             tuple[NDArray[float64]]: X, Y and Z coordinates of the disc in 3D space.
         """
-        x = 0.5 * self.camera_settings["d"] * (self.xl + self.xr) / (self.xl - self.xr)
-        z = (
-            -0.5 * self.camera_settings["d"] * (self.zl + self.zr) / (self.xl - self.xr)
-            + self.camera_settings["h"]
-        )
-        y = (
-            self.camera_settings["d"] * self.camera_settings["f"] / (self.xl - self.xr)
-            - self.camera_settings["c"]
+        return deproject_points(
+            self.xl, self.xr, self.zl, self.zr, self.camera_settings
         )
-        return (x, y, z)
 
     def read_tracks(self) -> None:
         """
-        Load the tracks data from file.
+        Load the tracks data from file, or from the store if one was given.
         """
-        tracks_directory = os.path.join(self.directory, "tracks")
-        L = np.load(os.path.join(tracks_directory, "left.npz"))
-        R = np.load(os.path.join(tracks_directory, "right.npz"))
+        if self.store is not None:
+            L, R = (
+                self.store.load(self.session, chanel) for chanel in ("left", "right")
+            )
+        else:
+            tracks_directory = os.path.join(self.directory, "tracks")
+            L = np.load(os.path.join(tracks_directory, "left.npz"))
+            R = np.load(os.path.join(tracks_directory, "right.npz"))
         time_index = self.get_time_index(L["t"], R["t"])
-        right = self.complete_tracks(R, time_index)
-        left = self.complete_tracks(L, time_index)
-        # Centre coordinates on 0
-        for track in [left, right]:
-            for i, axis in enumerate("xy"):
-                track[axis] -= int(self.camera_settings["resolution"][i] / 2)
-
-        self.xl = left["x"]
-        self.xr = right["x"]
-        self.zl = left["y"]
-        self.zr = right["y"]
+        left, right = align_tracks(
+            [(data["t"], np.column_stack([data["x"], data["y"]])) for data in (L, R)],
+            time_index,
+            self.camera_settings["resolution"],
+        )
+
+        self.t = time_index
+        self.xl, self.zl = left
+        self.xr, self.zr = right
 
     def read_camera_settings(self) -> None:
         """
         Read in the camera settings from file.
         """
-        with open(os.path.join(self.directory, "camera_settings.yaml")) as file:
-            self.camera_settings = yaml.safe_load(file)
-        self.camera_settings["f"] = (
-            self.camera_settings["focal_length"]
-            * self.camera_settings["resolution"][0]
-            / self.camera_settings["sensor_width"]
-        )
+        self.camera_settings = read_camera_settings(self.directory)
 
     @staticmethod
     def complete_tracks(
         data: NpzFile, time_index: npt.NDArray[np.int64]
-    ) -> dict[str, npt.NDArray[np.int64]]:
+    ) -> dict[str, npt.NDArray[np.float64]]:
         """
         Interpolate coordinates for missing frames and trim to coeval time period.
 
@@ -84,12 +176,9 @@ class DiscTrack:
             time_index (NDArray[int64]): Time values to interpolate for.
 
         Returns:
-            dict[str, NDArray[int64]]: Cleaned coordinate tracks for each axis.
+            dict[str, NDArray[float64]]: Cleaned coordinate tracks for each axis, in sub-pixels.
         """
-        return {
-            axis: np.interp(time_index, data["t"], data[axis]).astype(np.int64)
-            for axis in "xy"
-        }
+        return {axis: np.interp(time_index, data["t"], data[axis]) for axis in "xy"}
 
     @staticmethod
     def get_time_index(
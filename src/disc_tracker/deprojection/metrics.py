@@ -0,0 +1,112 @@
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from disc_tracker.deprojection.smoothing import read_disc_path
+
+
+def load_throws(directories: Iterable[str]) -> list[npt.NDArray[np.float64]]:
+    """
+    Load the smoothed 3D path of the disc in each dataset.
+
+    Args:
+        directories (Iterable[str]): Paths to directories containing `tracks` sub-directory.
+
+    Returns:
+        list[NDArray[float64]]: Time (frames), X, Y and Z of each throw, one row each.
+    """
+    throws = []
+    for directory in directories:
+        path = read_disc_path(directory)
+        throws.append(np.stack([path[axis] for axis in "txyz"]))
+    return throws
+
+
+def stack_throws(
+    throws: Sequence[npt.NDArray[np.float64]],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """
+    Stack throws of different lengths into one array, padding the end of shorter throws with NaN.
+
+    Args:
+        throws (Sequence[NDArray[float64]]): Time, X, Y and Z of each throw, one row each.
+
+    Returns:
+        tuple[NDArray[float64], NDArray[int64]]: Throws, with shape (throws, 4, frames), and the
+            number of frames in each throw.
+    """
+    lengths = np.array([throw.shape[1] for throw in throws], dtype=np.int64)
+    stacked = np.full((len(throws), 4, lengths.max(initial=0)), np.nan)
+    for padded, throw in zip(stacked, throws):
+        padded[:, : throw.shape[1]] = throw
+    return stacked, lengths
+
+
+def differentiate(
+    t: npt.NDArray[np.float64], values: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Differentiate padded values with respect to time by finite differences.
+
+    Central differences are used within each throw, and one-sided differences at either end.
+
+    Args:
+        t (NDArray[float64]): Time of each frame, with shape (throws, frames).
+        values (NDArray[float64]): Values to differentiate, with shape (throws, axes, frames).
+
+    Returns:
+        NDArray[float64]: Derivative of the values, with the same shape.
+    """
+    slopes = np.diff(values, axis=-1) / np.diff(t, axis=-1)[:, np.newaxis]
+    padding = np.full(values.shape[:-1] + (1,), np.nan)
+    forward = np.concatenate([slopes, padding], axis=-1)
+    backward = np.concatenate([padding, slopes], axis=-1)
+    return np.where(
+        np.isnan(forward),
+        backward,
+        np.where(np.isnan(backward), forward, (forward + backward) / 2),
+    )
+
+
+def flight_metrics(
+    throws: npt.NDArray[np.float64],
+    lengths: npt.NDArray[np.int64],
+    frame_rate: float,
+    release_frames: int = 5,
+) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Measure the flight of every throw at once.
+
+    Args:
+        throws (NDArray[float64]): Padded throws, from `stack_throws`.
+        lengths (NDArray[int64]): Number of frames in each throw, from `stack_throws`.
+        frame_rate (float): Frame rate of the videos in frames per second.
+        release_frames (int, optional): Number of frames at the start of each throw the release
+            speed is measured over. Defaults to 5.
+
+    Returns:
+        dict[str, NDArray[float64]]: Value of each metric for each throw. `velocity` (m/s) and
+            `acceleration` (m/s^2) have shape (throws, 3, frames) and `speed` (m/s) has shape
+            (throws, frames). `release_speed` (m/s), `max_speed` (m/s), `peak_height` (m),
+            `distance` (horizontal, m) and `hang_time` (s) have one value per throw.
+    """
+    t = throws[:, 0] / frame_rate
+    path = throws[:, 1:]
+    velocity = differentiate(t, path)
+    acceleration = differentiate(t, velocity)
+    speed = np.linalg.norm(velocity, axis=1)
+
+    rows = np.arange(len(throws))
+    last = np.maximum(lengths - 1, 0)
+    start, end = path[:, :, 0], path[rows, :, last]
+    return {
+        "velocity": velocity,
+        "acceleration": acceleration,
+        "speed": speed,
+        "release_speed": np.nanmedian(speed[:, :release_frames], axis=1),
+        "max_speed": np.nanmax(speed, axis=1),
+        "peak_height": np.nanmax(path[:, 2], axis=1),
+        "distance": np.linalg.norm((end - start)[:, :2], axis=1),
+        "hang_time": t[rows, last] - t[:, 0],
+    }
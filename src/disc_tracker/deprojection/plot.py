@@ -5,12 +5,12 @@ import numpy as np
 import plotly.graph_objects as go
 import yaml
 from disc_tracker.deprojection import settings
-from disc_tracker.deprojection.disc_track import DiscTrack
+from disc_tracker.deprojection.smoothing import load_disc_path
 
 
 class Plot:
     def __init__(self, directory: str) -> None:
-        self.disc_path = DiscTrack(directory).deproject()
+        self.disc_path = load_disc_path(directory)
         self.pitch_dimensions = self.get_pitch_dimensions(directory)
         self.directory = directory
         self.create_figure()
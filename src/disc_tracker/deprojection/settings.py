@@ -1 +1,12 @@
 UKU_PITCH_DIMENSIONS = {"width": 20, "length": 40, "endzone_depth": 5}
+# Window sizes are in frames, a window of 1 or less turns that filter off. Frames with a disparity
+# below `min_disparity` pixels are interpolated over, None turns this off. `fit` can be `ballistic`
+# to fit a parabola to the whole path. Everything is off by default, so the path is unchanged unless
+# smoothing is asked for.
+DEFAULT_SMOOTHING = {
+    "median_window": 1,
+    "savgol_window": 1,
+    "savgol_order": 2,
+    "min_disparity": None,
+    "fit": None,
+}
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import numpy.typing as npt
+import yaml
+from scipy import ndimage, signal
+
+from disc_tracker.deprojection import settings
+from disc_tracker.deprojection.disc_track import DiscTrack, deproject_points
+
+# Part of the cache key, increase when changing how the disc path is computed
+CACHE_VERSION = 1
+
+
+def read_smoothing_settings(directory: str) -> dict:
+    """
+    Read in the smoothing settings from `smoothing.yaml`, using the defaults for any not given.
+
+    Args:
+        directory (str): Path to the directory which may contain `smoothing.yaml`.
+
+    Returns:
+        dict: Smoothing settings.
+    """
+    smoothing = dict(settings.DEFAULT_SMOOTHING)
+    smoothing_path = os.path.join(directory, "smoothing.yaml")
+    if os.path.exists(smoothing_path):
+        with open(smoothing_path) as file:
+            smoothing.update(yaml.safe_load(file) or {})
+    return smoothing
+
+
+def fill_invalid(
+    t: npt.NDArray[np.float64],
+    coordinates: npt.NDArray[np.float64],
+    valid: npt.NDArray[np.bool_],
+) -> npt.NDArray[np.float64]:
+    """
+    Replace the coordinates of invalid frames by interpolating between the valid frames either side.
+
+    Args:
+        t (NDArray[float64]): Time of each frame.
+        coordinates (NDArray[float64]): Coordinates, one row per series and one column per frame.
+        valid (NDArray[bool]): Whether each frame is valid.
+
+    Returns:
+        NDArray[float64]: Coordinates with the invalid frames filled.
+    """
+    if not valid.any():
+        raise ValueError("No frames are valid")
+    if valid.all():
+        return coordinates
+
+    filled = coordinates.copy()
+    for series in filled:
+        series[~valid] = np.interp(t[~valid], t[valid], series[valid])
+    return filled
+
+
+def ballistic_fit(
+    t: npt.NDArray[np.float64], path: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Fit a parabola in time to each axis of the path, as for a projectile under constant acceleration.
+
+    Args:
+        t (NDArray[float64]): Time of each frame.
+        path (NDArray[float64]): 3D coordinates, one row per axis and one column per frame.
+
+    Returns:
+        NDArray[float64]: Fitted coordinates, with the same shape as `path`.
+    """
+    coefficients = np.polynomial.polynomial.polyfit(t - t[0], path.T, 2)
+    return np.polynomial.polynomial.polyval(t - t[0], coefficients)
+
+
+def smooth_path(
+    t: npt.NDArray[np.float64],
+    xl: npt.NDArray[np.float64],
+    xr: npt.NDArray[np.float64],
+    zl: npt.NDArray[np.float64],
+    zr: npt.NDArray[np.float64],
+    camera_settings: dict,
+    smoothing: dict,
+) -> npt.NDArray[np.float64]:
+    """
+    Reject outliers, smooth the aligned 2D tracks of both cameras and deproject them into 3D space.
+
+    Each filter is applied to all four coordinate series at once.
+
+    Args:
+        t (NDArray[float64]): Time of each frame.
+        xl (NDArray[float64]): Horizontal coordinates in the left camera.
+        xr (NDArray[float64]): Horizontal coordinates in the right camera.
+        zl (NDArray[float64]): Vertical coordinates in the left camera.
+        zr (NDArray[float64]): Vertical coordinates in the right camera.
+        camera_settings (dict): Camera settings, from `read_camera_settings`.
+        smoothing (dict): Smoothing settings, from `read_smoothing_settings`.
+
+    Returns:
+        NDArray[float64]: X, Y and Z coordinates of the disc, one row per axis.
+    """
+    coordinates = np.stack([xl, xr, zl, zr]).astype(np.float64)
+    if smoothing["median_window"] > 1:
+        # Removes single frame detection jumps, while keeping genuine changes in direction
+        coordinates = ndimage.median_filter(
+            coordinates, size=(1, smoothing["median_window"]), mode="nearest"
+        )
+    # Depth is inversely proportional to disparity, so small disparities give huge spikes. This
+    # only holds for parallel cameras, the raw disparity of a calibrated rig says nothing about depth.
+    if smoothing["min_disparity"] is not None and "calibration" not in camera_settings:
+        valid = coordinates[0] - coordinates[1] >= smoothing["min_disparity"]
+        if valid.any():
+            coordinates = fill_invalid(t, coordinates, valid)
+        else:
+            # Nothing to interpolate from, e.g. the setting is too high for these cameras
+            print(
+                f"Ignoring min_disparity ({smoothing['min_disparity']} px), every frame is "
+                "below it. Lower or remove it in smoothing.yaml."
+            )
+    window = min(smoothing["savgol_window"], len(t) - (len(t) % 2 == 0))
+    if window > max(1, smoothing["savgol_order"]):
+        coordinates = signal.savgol_filter(
+            coordinates, window, smoothing["savgol_order"], axis=1, mode="interp"
+        )
+
+    path = np.stack(deproject_points(*coordinates, camera_settings))
+    if smoothing["fit"] == "ballistic":
+        path = ballistic_fit(t, path)
+    elif smoothing["fit"] is not None:
+        raise ValueError(f"Unknown fit '{smoothing['fit']}'")
+    return path
+
+
+def disc_path_inputs(directory: str) -> list[str]:
+    """
+    List the files a disc path is computed from.
+
+    Args:
+        directory (str): Path to the directory containing `tracks` sub-directory.
+
+    Returns:
+        list[str]: Paths of the input files, including the stereo calibration if there is one.
+    """
+    camera_settings_path = os.path.join(directory, "camera_settings.yaml")
+    inputs = [
+        os.path.join(directory, "tracks", "left.npz"),
+        os.path.join(directory, "tracks", "right.npz"),
+        camera_settings_path,
+    ]
+    with open(camera_settings_path) as file:
+        calibration = yaml.safe_load(file).get("calibration")
+    if calibration is not None:
+        inputs.append(os.path.join(directory, calibration))
+    return inputs
+
+
+def disc_path_key(directory: str, smoothing: dict) -> str:
+    """
+    Hash the contents of everything the smoothed disc path is computed from.
+
+    Args:
+        directory (str): Path to the directory containing `tracks` sub-directory.
+        smoothing (dict): Smoothing settings, from `read_smoothing_settings`.
+
+    Returns:
+        str: Hexadecimal digest, which changes if any input changes.
+    """
+    digest = hashlib.sha256(f"{CACHE_VERSION}".encode())
+    for path in disc_path_inputs(directory):
+        with open(path, "rb") as file:
+            digest.update(hashlib.file_digest(file, "sha256").digest())
+    digest.update(json.dumps(smoothing, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def read_disc_path(directory: str) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Get the smoothed 3D path of the disc, from the cache in `tracks/cache` if it has been computed.
+
+    The cache is keyed on the contents of the tracks, camera settings and smoothing settings, so
+    plotting unchanged data again only loads one small file. Only the latest path is kept.
+
+    Args:
+        directory (str): Path to directory containing `tracks` sub-directory.
+
+    Returns:
+        dict[str, NDArray[float64]]: Time (frames) and X, Y and Z coordinates of the disc.
+    """
+    smoothing = read_smoothing_settings(directory)
+    cache_directory = os.path.join(directory, "tracks", "cache")
+    filename = os.path.join(
+        cache_directory, f"disc_path-{disc_path_key(directory, smoothing)}.npz"
+    )
+    if os.path.exists(filename):
+        with np.load(filename) as cached:
+            return {axis: cached[axis] for axis in "txyz"}
+
+    disc_track = DiscTrack(directory)
+    x, y, z = smooth_path(
+        disc_track.t,
+        disc_track.xl,
+        disc_track.xr,
+        disc_track.zl,
+        disc_track.zr,
+        disc_track.camera_settings,
+        smoothing,
+    )
+    path = {"t": disc_track.t, "x": x, "y": y, "z": z}
+    os.makedirs(cache_directory, exist_ok=True)
+    # Written under a temporary name, so an interrupted write isn't mistaken for a cached path
+    with open(f"{filename}.tmp", "wb") as file:
+        np.savez(file, **path)
+    os.replace(f"{filename}.tmp", filename)
+    # Paths cached for previous inputs can't be used again
+    for entry in os.listdir(cache_directory):
+        stale = os.path.join(cache_directory, entry)
+        if (
+            entry.startswith("disc_path-")
+            and entry.endswith(".npz")
+            and stale != filename
+        ):
+            os.remove(stale)
+    return path
+
+
+def load_disc_path(directory: str) -> tuple[npt.NDArray[np.float64]]:
+    """
+    Get the smoothed 3D path of the disc.
+
+    Args:
+        directory (str): Path to directory containing `tracks` sub-directory.
+
+    Returns:
+        tuple[NDArray[float64]]: X, Y and Z coordinates of the disc in 3D space.
+    """
+    path = read_disc_path(directory)
+    return (path["x"], path["y"], path["z"])
@@ -0,0 +1,104 @@
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+from disc_tracker.deprojection.disc_track import align_tracks, deproject_points
+
+CHANELS = ("left", "right")
+
+
+class StreamingDiscTrack:
+    """
+    Deprojects the disc into 3D space incrementally, as samples from each camera arrive.
+
+    Only the most recent `window` samples of each chanel are kept, so memory use is bounded
+    however long the stream runs.
+    """
+
+    def __init__(self, camera_settings: dict, window: int = 64) -> None:
+        """
+        Initialise class.
+
+        Args:
+            camera_settings (dict): Camera settings, from `read_camera_settings`.
+            window (int, optional): Number of recent samples kept for each chanel. Defaults to 64.
+        """
+        self.camera_settings = camera_settings
+        self.samples = {chanel: deque(maxlen=window) for chanel in CHANELS}
+        self.next_time = None  # Next time to deproject
+        self.gaps = (
+            []
+        )  # First and last time of each run of frames that was never deprojected
+
+    def push(
+        self, chanel: str, t: float, x: float, y: float
+    ) -> npt.NDArray[np.float64]:
+        """
+        Add a sample from one camera and deproject every time that can now be aligned with the other.
+
+        A time can be deprojected once both chanels have samples at or after it. Missing frames are
+        linearly interpolated. If one chanel runs more than `window` samples ahead of the other,
+        the oldest times can no longer be interpolated. They are skipped, and recorded in `gaps`.
+
+        Args:
+            chanel (str): Chanel the sample is from. Either `left` or `right`.
+            t (float): Time of the sample (frame number). Must increase for each chanel.
+            x (float): Horizontal pixel coordinate of the disc.
+            y (float): Vertical pixel coordinate of the disc.
+
+        Returns:
+            NDArray[float64]: New points, one row per frame with columns t, X, Y and Z.
+        """
+        samples = self.samples[chanel]
+        if samples and t <= samples[-1][0]:
+            raise ValueError(
+                f"Samples must be pushed in time order for {chanel} chanel"
+            )
+        samples.append((t, x, y))
+
+        if not all(self.samples.values()):
+            return np.empty((0, 4))
+        # Times older than the window of either chanel can no longer be interpolated
+        start = np.ceil(max(s[0][0] for s in self.samples.values()))
+        stop = np.floor(min(s[-1][0] for s in self.samples.values()))
+        if self.next_time is not None and stop >= start > self.next_time:
+            self.gaps.append((self.next_time, start - 1))
+            print(
+                f"Skipping frames {self.next_time:.0f} to {start - 1:.0f}, one chanel is more "
+                f"than {self.samples[chanel].maxlen} samples ahead of the other"
+            )
+        if self.next_time is not None:
+            start = max(start, self.next_time)
+        if stop < start:
+            return np.empty((0, 4))
+
+        time_index = np.arange(start, stop + 1)
+        self.next_time = stop + 1
+        tracks = [np.array(self.samples[chanel]) for chanel in CHANELS]
+        left, right = align_tracks(
+            [(track[:, 0], track[:, 1:]) for track in tracks],
+            time_index,
+            self.camera_settings["resolution"],
+        )
+        (xl, zl), (xr, zr) = left, right
+
+        return np.column_stack(
+            [time_index, *deproject_points(xl, xr, zl, zr, self.camera_settings)]
+        )
+
+    def stream(
+        self, samples: Iterable[tuple[str, float, float, float]]
+    ) -> Iterator[npt.NDArray[np.float64]]:
+        """
+        Deproject a stream of samples from both cameras.
+
+        Args:
+            samples (Iterable[tuple[str, float, float, float]]): Chanel, t, x and y of each sample.
+
+        Yields:
+            NDArray[float64]: Each new point (t, X, Y, Z), as soon as it can be deprojected.
+        """
+        for sample in samples:
+            yield from self.push(*sample)
@@ -0,0 +1,204 @@
+import json
+import os
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+COLUMNS = ("x", "y", "t")
+DTYPE = np.dtype("<f8")
+INDEX_FILENAME = "index.json"
+
+
+class TrackStore:
+    """
+    Append-only store of the disc tracks from many sessions, e.g. a whole season.
+
+    The store is a directory holding one raw, memory-mapped file per column (x, y and t) with the
+    tracks of every session and chanel concatenated, and an index giving the session, chanel, time
+    range and position of each track. Saving a track for a session and chanel already in the store
+    replaces it in the index, the old data is left in the column files.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialise class, creating an empty store if the directory doesn't exist.
+
+        Args:
+            directory (str): Path to the store.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        index_filename = os.path.join(directory, INDEX_FILENAME)
+        self.index = {}
+        if os.path.exists(index_filename):
+            with open(index_filename) as file:
+                for entry in json.load(file):
+                    self.index[(entry["session"], entry["chanel"])] = entry
+        self._columns = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self.index
+
+    def column_filename(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.f8")
+
+    @property
+    def columns(self) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Memory-mapped columns of every track.
+
+        Appending truncates the column files, which fails on Windows while they are mapped, so
+        views of these must be released before appending. `load` returns copies instead.
+        """
+        if self._columns is None:
+            self._columns = {}
+            for column in COLUMNS:
+                filename = self.column_filename(column)
+                if os.path.exists(filename) and os.path.getsize(filename) > 0:
+                    self._columns[column] = np.memmap(filename, dtype=DTYPE, mode="r")
+                else:
+                    # Empty files can't be mapped
+                    self._columns[column] = np.empty(0, dtype=DTYPE)
+        return self._columns
+
+    def append(self, session: str, chanel: str, track: npt.NDArray[np.float64]) -> None:
+        """
+        Add the track of the disc in one chanel of a session to the store.
+
+        Args:
+            session (str): Name of the session.
+            chanel (str): Video chanel. Either `left` or `right`.
+            track (NDArray[float64]): Coordinates and times of the disc (x, y, t), sorted by time.
+        """
+        track = np.asarray(track, dtype=DTYPE)
+        # Unmap the columns before the files are written and truncated
+        self._columns = None
+        filenames = [self.column_filename(column) for column in COLUMNS]
+        sizes = [os.path.getsize(f) if os.path.exists(f) else 0 for f in filenames]
+        # An interrupted append can leave the columns with different lengths, so write after the
+        # shortest and discard the rest
+        offset = min(sizes) // DTYPE.itemsize
+        for i, filename in enumerate(filenames):
+            with open(filename, "r+b" if os.path.exists(filename) else "wb") as file:
+                file.seek(offset * DTYPE.itemsize)
+                file.write(track[:, i].tobytes())
+                file.truncate()
+
+        self.index[(session, chanel)] = {
+            "session": session,
+            "chanel": chanel,
+            "offset": int(offset),
+            "length": len(track),
+            "start": float(track[0, 2]) if len(track) else None,
+            "stop": float(track[-1, 2]) if len(track) else None,
+        }
+        self.save_index()
+
+    def save_index(self) -> None:
+        """
+        Write the index to file, replacing it atomically.
+        """
+        filename = os.path.join(self.directory, INDEX_FILENAME)
+        with open(f"{filename}.tmp", "w") as file:
+            json.dump(list(self.index.values()), file, indent=1)
+        os.replace(f"{filename}.tmp", filename)
+
+    def load(
+        self,
+        session: str,
+        chanel: str,
+        start: float | None = None,
+        stop: float | None = None,
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Get the track of the disc in one chanel of a session, optionally only between two times.
+
+        Args:
+            session (str): Name of the session.
+            chanel (str): Video chanel. Either `left` or `right`.
+            start (float, optional): Earliest time to include. Defaults to None (the start).
+            stop (float, optional): Latest time to include. Defaults to None (the end).
+
+        Returns:
+            dict[str, NDArray[float64]]: Each column (x, y and t) of the track, like the `.npz` files.
+                These are copies, so are unaffected by later appends.
+        """
+        entry = self.index[(session, chanel)]
+        begin, end = entry["offset"], entry["offset"] + entry["length"]
+        columns = self.columns
+        t = columns["t"][begin:end]
+        if start is not None:
+            begin += int(np.searchsorted(t, start, side="left"))
+        if stop is not None:
+            end = entry["offset"] + int(np.searchsorted(t, stop, side="right"))
+        return {column: np.array(columns[column][begin:end]) for column in COLUMNS}
+
+    def query(
+        self,
+        session: str | None = None,
+        chanel: str | None = None,
+        start: float | None = None,
+        stop: float | None = None,
+    ) -> list[tuple[str, str]]:
+        """
+        Find the tracks matching a session and chanel and overlapping a time range.
+
+        Args:
+            session (str, optional): Name of the session. Defaults to None (any session).
+            chanel (str, optional): Video chanel. Defaults to None (any chanel).
+            start (float, optional): Start of the time range. Defaults to None (unbounded).
+            stop (float, optional): End of the time range. Defaults to None (unbounded).
+
+        Returns:
+            list[tuple[str, str]]: Session and chanel of each matching track.
+        """
+        return [
+            key
+            for key, entry in self.index.items()
+            if (session is None or entry["session"] == session)
+            and (chanel is None or entry["chanel"] == chanel)
+            and entry["length"] > 0
+            and (start is None or entry["stop"] >= start)
+            and (stop is None or entry["start"] <= stop)
+        ]
+
+
+def session_name(directory: str) -> str:
+    """
+    Name a session in a store by the absolute path of its directory.
+
+    Sessions are named the same whether they are tracked alone or in a batch, and directories
+    with the same name in different places don't collide.
+
+    Args:
+        directory (str): Path to the session directory.
+
+    Returns:
+        str: Name of the session.
+    """
+    return os.path.realpath(directory)
+
+
+def append_session(
+    store: TrackStore,
+    directory: str,
+    chanels: Sequence[str],
+    session: str | None = None,
+) -> None:
+    """
+    Add the disc tracks saved in a session's `tracks` sub-directory to a store.
+
+    Args:
+        store (TrackStore): Store to append the tracks to.
+        directory (str): Path to the directory containing `tracks` sub-directory.
+        chanels (Sequence[str]): Video chanels to add, e.g. `gg6.CHANELS`.
+        session (str, optional): Name of the session in the store. Defaults to None (from `session_name`).
+    """
+    session = session or session_name(directory)
+    for chanel in chanels:
+        with np.load(os.path.join(directory, "tracks", f"{chanel}.npz")) as data:
+            store.append(session, chanel, np.column_stack([data[c] for c in COLUMNS]))
@@ -0,0 +1,212 @@
+from collections.abc import Iterable
+from typing import BinaryIO, OrderedDict
+
+import numpy as np
+import numpy.typing as npt
+
+from disc_tracker.track_store import TrackStore
+from disc_tracker.video_processing.tracker import Object
+
+
+def merge_tracks(tracks: Iterable[npt.NDArray[np.float64]]) -> npt.NDArray[np.float64]:
+    """
+    Join several tracks, e.g. if the disc was split across several ids.
+
+    Where more than one track has a detection at the same time, the first track given is used.
+
+    Args:
+        tracks (Iterable[NDArray[float64]]): Tracks (x, y, t) to join, in order of preference.
+
+    Returns:
+        NDArray[float64]: Coordinates and times of the joined track (x, y, t), sorted by time. Empty
+            if no tracks are given.
+    """
+    track = np.concatenate([np.empty((0, 3)), *tracks])
+    # Stable sort keeps the preferred track first within each time
+    track = track[np.argsort(track[:, 2], kind="stable")]
+    first = np.concatenate([[True], np.diff(track[:, 2]) != 0])[: len(track)]
+    return track[first]
+
+
+def read_array_header(file: BinaryIO) -> tuple[tuple[int, ...], bool, np.dtype]:
+    """
+    Read the header of the next `.npy` array in a file, leaving the file at the start of its data.
+
+    Args:
+        file (BinaryIO): Open file.
+
+    Returns:
+        tuple[tuple[int, ...], bool, dtype]: Shape, whether it is in Fortran order, and data type.
+    """
+    if np.lib.format.read_magic(file) == (1, 0):
+        return np.lib.format.read_array_header_1_0(file)
+    return np.lib.format.read_array_header_2_0(file)
+
+
+def save_track(
+    filename: str,
+    track: npt.NDArray[np.float64],
+    store: TrackStore | None = None,
+    key: tuple[str, str] | None = None,
+) -> None:
+    """
+    Write the track of the disc to file, and optionally append it to a track store.
+
+    Args:
+        filename (str): Name to save the file as.
+        track (NDArray[float64]): Coordinates and times of the disc (x, y, t).
+        store (TrackStore, optional): Store to also append the track to. Defaults to None.
+        key (tuple[str, str], optional): Session and chanel of the track in the store. Defaults to None.
+    """
+    np.savez(filename, x=track[:, 0], y=track[:, 1], t=track[:, 2])
+    if store is not None:
+        store.append(*key, track)
+
+
+def save_track_archive(filename: str, tracks: OrderedDict[np.int64, Object]) -> None:
+    """
+    Write the tracks of every object to a single file.
+
+    The file holds four consecutive `.npy` arrays: the object ids, the offset of each object's
+    track, the mean blob size of each object, and the x, y and t columns of all tracks
+    concatenated, so it can be memory-mapped.
+
+    Args:
+        filename (str): Name to save the file as.
+        tracks (OrderedDict[int64, Object]): Dictonary of objects tracked in the video.
+    """
+    ids = np.fromiter(tracks, dtype=np.int64, count=len(tracks))
+    lengths = np.fromiter(
+        (len(o.track) for o in tracks.values()), dtype=np.int64, count=len(tracks)
+    )
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    sizes = np.fromiter(
+        (o.mean_size for o in tracks.values()), dtype=np.float64, count=len(tracks)
+    )
+    columns = np.empty((3, offsets[-1]), dtype=np.float64)
+    for o, start, stop in zip(tracks.values(), offsets[:-1], offsets[1:]):
+        columns[:, start:stop] = o.track.T
+
+    with open(filename, "wb") as file:
+        for array in (ids, offsets, sizes, columns):
+            np.lib.format.write_array(file, array, allow_pickle=False)
+
+
+class TrackArchive:
+    """
+    Read-only, memory-mapped view of the tracks written by `save_track_archive`.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """
+        Initialise class.
+
+        Args:
+            filename (str): Path to the archive.
+        """
+        self.filename = filename
+        with open(filename, "rb") as file:
+            self.ids = np.lib.format.read_array(file)
+            self.offsets = np.lib.format.read_array(file)
+            # Archives written before sizes were saved go straight to the columns
+            self.sizes = np.full(len(self.ids), np.nan)
+            shape, fortran_order, dtype = read_array_header(file)
+            if len(shape) == 1:
+                self.sizes = np.frombuffer(
+                    file.read(shape[0] * dtype.itemsize), dtype=dtype
+                )
+                shape, fortran_order, dtype = read_array_header(file)
+            # Only the header of the (large) columns array is read, the data is mapped
+            data_offset = file.tell()
+        if np.prod(shape) == 0:
+            # Empty files can't be mapped
+            self.columns = np.empty(shape, dtype=dtype)
+        else:
+            self.columns = np.memmap(
+                filename,
+                dtype=dtype,
+                mode="r",
+                offset=data_offset,
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+        self.index = {id: i for i, id in enumerate(self.ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id: np.int64) -> bool:
+        return id in self.index
+
+    def track(self, id: np.int64) -> npt.NDArray[np.float64]:
+        """
+        Get the track of one object.
+
+        Args:
+            id (int64): ID of the object.
+
+        Returns:
+            NDArray[float64]: Coordinates and times of the object (x, y, t), one row per detection.
+        """
+        i = self.index[id]
+        return self.columns[:, self.offsets[i] : self.offsets[i + 1]].T
+
+    def mean_size(self, id: np.int64) -> float:
+        """
+        Get the mean diameter of the blobs detected for one object.
+
+        Args:
+            id (int64): ID of the object.
+
+        Returns:
+            float: Mean blob diameter, NaN if unknown.
+        """
+        return float(self.sizes[self.index[id]])
+
+    def mean_sizes(self) -> dict[int, float]:
+        """
+        Get the mean diameter of the blobs detected for every object.
+
+        Returns:
+            dict[int, float]: Mean blob diameter of each object, NaN if unknown.
+        """
+        return dict(zip(self.index, self.sizes.tolist()))
+
+    def tracks(self) -> dict[int, npt.NDArray[np.float64]]:
+        """
+        Get the tracks of every object.
+
+        Returns:
+            dict[int, NDArray[float64]]: Coordinates and times (x, y, t) of each object.
+        """
+        return {id: self.track(id) for id in self.index}
+
+    def merge(self, ids: Iterable[np.int64]) -> npt.NDArray[np.float64]:
+        """
+        Join the tracks of several objects, e.g. if the disc was split across several ids.
+
+        Args:
+            ids (Iterable[int64]): IDs of the objects, in order of preference.
+
+        Returns:
+            NDArray[float64]: Coordinates and times of the joined track (x, y, t), sorted by time.
+        """
+        return merge_tracks(self.track(id) for id in ids)
+
+    def save_disc_track(
+        self,
+        filename: str,
+        ids: Iterable[np.int64],
+        store: TrackStore | None = None,
+        key: tuple[str, str] | None = None,
+    ) -> None:
+        """
+        Write the track corresponding to the disc to file, and optionally append it to a track store.
+
+        Args:
+            filename (str): Name to save the file as.
+            ids (Iterable[int64]): IDs of the objects which are the disc, in order of preference.
+            store (TrackStore, optional): Store to also append the track to. Defaults to None.
+            key (tuple[str, str], optional): Session and chanel of the track in the store. Defaults to None.
+        """
+        save_track(filename, self.merge(ids), store, key)
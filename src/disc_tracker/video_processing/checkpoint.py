@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import pickle
+
+import cv2 as cv
+import numpy as np
+
+from disc_tracker.video_processing.tracker import Tracker
+
+
+def checkpoint_key(
+    video: cv.VideoCapture, parameters: dict, roi: cv.typing.MatLike | None = None
+) -> str:
+    """
+    Hash the first frame of the video and the settings objects are tracked with.
+
+    Only the first frame is hashed, not the whole file, so footage can be appended to the video
+    and tracking resumed.
+
+    Args:
+        video (VideoCapture): Input video. Its position is left unchanged.
+        parameters (dict): Tracking settings, e.g. the scale. Must be JSON serialisable.
+        roi (MatLike, optional): Binary mask of the region objects are detected in. Defaults to None.
+
+    Returns:
+        str: Hexadecimal digest, which changes if the video is replaced or any setting changes.
+    """
+    position = video.get(cv.CAP_PROP_POS_FRAMES)
+    video.set(cv.CAP_PROP_POS_FRAMES, 0)
+    _, frame = video.read()
+    video.set(cv.CAP_PROP_POS_FRAMES, position)
+
+    digest = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode())
+    for array in (frame, roi):
+        if array is not None:
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def save_checkpoint(
+    filename: str, tracker: Tracker, key: str | None = None, complete: bool = False
+) -> None:
+    """
+    Write the state of a tracker to file, so tracking can be resumed later.
+
+    The file is replaced atomically, so an interruption while saving leaves the previous checkpoint intact.
+
+    Args:
+        filename (str): Name to save the file as.
+        tracker (Tracker): Tracker to save. Its `current_time` is the next frame to process.
+        key (str, optional): Key of the video and settings, from `checkpoint_key`. Defaults to None.
+        complete (bool, optional): Whether the whole video has been tracked. Defaults to False.
+    """
+    temporary_filename = f"{filename}.tmp"
+    with open(temporary_filename, "wb") as file:
+        pickle.dump(
+            {"key": key, "complete": complete, "tracker": tracker},
+            file,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(temporary_filename, filename)
+
+
+def load_checkpoint(
+    filename: str, key: str | None = None, frame_count: int | None = None
+) -> Tracker | None:
+    """
+    Read the state of a tracker from file, if it was saved for the same video and settings.
+
+    A complete checkpoint is only resumed if footage has since been appended to the video.
+
+    Args:
+        filename (str): Path to the checkpoint.
+        key (str, optional): Key of the video and settings, from `checkpoint_key`. Defaults to None.
+        frame_count (int, optional): Number of frames now in the video. Defaults to None (unknown).
+
+    Returns:
+        Tracker | None: Saved tracker, or None if there is no checkpoint to resume.
+    """
+    if not os.path.exists(filename):
+        return None
+
+    with open(filename, "rb") as file:
+        checkpoint = pickle.load(file)
+    if not isinstance(checkpoint, dict) or checkpoint["key"] != key:
+        print(f"Ignoring checkpoint '{filename}' for a different video or settings")
+        return None
+    tracker = checkpoint["tracker"]
+    if checkpoint["complete"] and (
+        frame_count is None or frame_count <= tracker.current_time
+    ):
+        print(f"Ignoring complete checkpoint '{filename}'")
+        return None
+    return tracker
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterator, Sequence
+
+import cv2 as cv
+import numpy as np
+import numpy.typing as npt
+
+# Part of the cache key, increase when changing how objects are detected
+CACHE_VERSION = 1
+
+
+def detection_key(
+    video_filename: str, parameters: dict, roi: cv.typing.MatLike | None = None
+) -> str:
+    """
+    Hash the contents of the video and the settings objects are detected with.
+
+    Args:
+        video_filename (str): Path to the video.
+        parameters (dict): Detection settings, e.g. the scale. Must be JSON serialisable.
+        roi (MatLike, optional): Binary mask of the region objects are detected in. Defaults to None.
+
+    Returns:
+        str: Hexadecimal digest, which changes if the video or any setting changes.
+    """
+    digest = hashlib.sha256(f"{CACHE_VERSION}".encode())
+    with open(video_filename, "rb") as file:
+        digest.update(hashlib.file_digest(file, "sha256").digest())
+    digest.update(json.dumps(parameters, sort_keys=True).encode())
+    if roi is not None:
+        digest.update(np.ascontiguousarray(roi).tobytes())
+    return digest.hexdigest()
+
+
+class DetectionRecorder:
+    """
+    Collects the keypoints detected in each frame, to be saved as a ragged array.
+    """
+
+    def __init__(self) -> None:
+        self.frame_indices = []
+        self.counts = []
+        self.keypoints = []
+
+    def add(self, frame_index: int, blobs: Sequence[cv.KeyPoint]) -> None:
+        """
+        Record the keypoints detected in a frame.
+
+        Args:
+            frame_index (int): Index of the frame.
+            blobs (Sequence[KeyPoint]): Keypoints detected in the frame, possibly none.
+        """
+        self.frame_indices.append(frame_index)
+        self.counts.append(len(blobs))
+        self.keypoints.extend((*blob.pt, blob.size) for blob in blobs)
+
+    def save(self, filename: str) -> None:
+        """
+        Write the detections to file, replacing it atomically.
+
+        Args:
+            filename (str): Name to save the file as.
+        """
+        keypoints = np.array(self.keypoints, dtype=np.float32).reshape(-1, 3)
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        # Written under a temporary name, so an interrupted write isn't mistaken for a cache
+        with open(f"{filename}.tmp", "wb") as file:
+            np.savez(
+                file,
+                frame_indices=np.array(self.frame_indices, dtype=np.int64),
+                offsets=np.concatenate([[0], np.cumsum(self.counts, dtype=np.int64)]),
+                points=keypoints[:, 0:2],
+                sizes=keypoints[:, 2],
+            )
+        os.replace(f"{filename}.tmp", filename)
+
+
+def load_detections(filename: str) -> dict[str, npt.NDArray]:
+    """
+    Read the detections written by `DetectionRecorder.save`.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        dict[str, NDArray]: Index of each frame (`frame_indices`), the start of each frame's keypoints
+            and the end of the last (`offsets`), and the coordinates (`points`) and diameters (`sizes`)
+            of the keypoints of every frame concatenated.
+    """
+    with np.load(filename) as data:
+        return {name: data[name] for name in data.files}
+
+
+def iter_detections(
+    detections: dict[str, npt.NDArray],
+) -> Iterator[tuple[int, npt.NDArray[np.float32], npt.NDArray[np.float32]]]:
+    """
+    Split cached detections into frames.
+
+    Args:
+        detections (dict[str, NDArray]): Detections, from `load_detections`.
+
+    Yields:
+        tuple[int, NDArray[float32], NDArray[float32]]: Index of each frame, and the coordinates and
+            diameters of the keypoints detected in it.
+    """
+    offsets = detections["offsets"].tolist()
+    points, sizes = detections["points"], detections["sizes"]
+    for i, frame_index in enumerate(detections["frame_indices"].tolist()):
+        start, stop = offsets[i], offsets[i + 1]
+        yield frame_index, points[start:stop], sizes[start:stop]
@@ -0,0 +1,114 @@
+from collections.abc import Mapping
+from typing import OrderedDict
+
+import numpy as np
+import numpy.typing as npt
+from scipy import stats
+
+from disc_tracker.video_processing.tracker import Object
+
+# Weight of each feature when ranking objects. Larger features rank higher when the weight is
+# positive and lower when it is negative.
+FEATURE_WEIGHTS = {
+    "length": 0.5,  # Number of detections
+    "speed": 1.0,  # Median speed (pixels/frame)
+    "roughness": -1.0,  # Deviation from a parabola, relative to the distance covered
+    "size": -0.5,  # Mean blob diameter (pixels)
+}
+
+
+def track_features(track: npt.NDArray[np.float64]) -> dict[str, float]:
+    """
+    Measure the features of a track used to tell if it is the disc.
+
+    Args:
+        track (NDArray[float64]): Coordinates and times of the object (x, y, t).
+
+    Returns:
+        dict[str, float]: Length, speed and roughness of the track.
+    """
+    xy, t = track[:, 0:2], track[:, 2]
+    steps = np.linalg.norm(np.diff(xy, axis=0), axis=1) / np.diff(t)
+    # A disc in flight follows a smooth, roughly parabolic path in the image
+    coefficients = np.polynomial.polynomial.polyfit(t - t[0], xy, 2)
+    fitted = np.polynomial.polynomial.polyval(t - t[0], coefficients).T
+    rms_residual = np.sqrt(np.mean(np.sum((xy - fitted) ** 2, axis=1)))
+    extent = np.linalg.norm(np.ptp(xy, axis=0))
+
+    return {
+        "length": len(track),
+        "speed": np.median(steps),
+        "roughness": rms_residual / (extent + 1),
+    }
+
+
+def score_tracks(
+    tracks: Mapping[int, npt.NDArray[np.float64]],
+    sizes: Mapping[int, float] | None = None,
+    min_length: int = 10,
+) -> dict[int, float]:
+    """
+    Score how disc-like every object is, by ranking them on each feature in `FEATURE_WEIGHTS`.
+
+    Args:
+        tracks (Mapping[int, NDArray[float64]]): Track (x, y, t) of each object.
+        sizes (Mapping[int, float], optional): Mean blob diameter of each object. Defaults to None (unknown).
+        min_length (int, optional): Objects with fewer detections than this aren't scored. Defaults to 10.
+
+    Returns:
+        dict[int, float]: Score of each object with enough detections, higher is more disc-like.
+    """
+    ids = [id for id, track in tracks.items() if len(track) >= max(min_length, 3)]
+    if not ids:
+        return {}
+
+    features = [track_features(tracks[id]) for id in ids]
+    for id, f in zip(ids, features):
+        f["size"] = np.nan if sizes is None else sizes[id]
+    scores = np.zeros(len(ids))
+    for name, weight in FEATURE_WEIGHTS.items():
+        values = np.array([f[name] for f in features], dtype=np.float64)
+        # Scale ranks to [0, 1], unknown values are given the middle rank
+        ranks = np.full(len(values), 0.5)
+        known = ~np.isnan(values)
+        if known.sum() > 1:
+            ranks[known] = (stats.rankdata(values[known]) - 1) / (known.sum() - 1)
+        scores += weight * ranks
+
+    return dict(zip(map(int, ids), scores.tolist()))
+
+
+def score_objects(
+    objects: OrderedDict[np.int64, Object], min_length: int = 10
+) -> dict[int, float]:
+    """
+    Score how disc-like every tracked object is.
+
+    Args:
+        objects (OrderedDict[int64, Object]): Dictionary of objects tracked in the video.
+        min_length (int, optional): Objects with fewer detections than this aren't scored. Defaults to 10.
+
+    Returns:
+        dict[int, float]: Score of each object with enough detections, higher is more disc-like.
+    """
+    return score_tracks(
+        {id: o.track for id, o in objects.items()},
+        {id: o.mean_size for id, o in objects.items()},
+        min_length,
+    )
+
+
+def identify_disc(scores: Mapping[int, float]) -> int | None:
+    """
+    Find the object most likely to be the disc.
+
+    Args:
+        scores (Mapping[int, float]): Score of each object, from `score_tracks` or `score_objects`.
+
+    Returns:
+        int | None: ID of the disc, or None if no object was scored.
+    """
+    if not scores:
+        return None
+
+    return max(scores, key=scores.get)
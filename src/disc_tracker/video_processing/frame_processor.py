@@ -0,0 +1,330 @@
+from collections.abc import Sequence
+
+import cv2 as cv
+import numpy as np
+
+# Motion gate parameters. Frames are compared with a running average of previous frames at a
+# quarter of full resolution, and are gated if too small a fraction of the gated area (the whole
+# frame or the region of interest) differs by more than the threshold.
+GATE_SCALE = 0.25
+GATE_PIXEL_THRESHOLD = 20  # Grey levels
+GATE_MIN_FRACTION = 1e-4
+GATE_REFERENCE_RATE = 0.05  # Weight of each new frame in the running average
+# No frames are gated until the background model has learnt the scene from this many frames
+GATE_WARM_UP_FRAMES = 30
+# The background model is still updated every this many gated frames, to follow lighting changes
+GATE_REFRESH_INTERVAL = 25
+
+
+def scaled_kernel_size(size: int, scale: float) -> tuple[int, int]:
+    """
+    Scale the size of a structuring element, keeping it odd and at least 1 pixel.
+
+    Args:
+        size (int): Size of the kernel at full resolution.
+        scale (float): Factor the frame has been resized by.
+
+    Returns:
+        tuple[int, int]: Scaled kernel size.
+    """
+    size = max(1, round(size * scale))
+    size += 1 - size % 2
+    return (size, size)
+
+
+def setup_blob_detector(scale: float = 1.0) -> cv.SimpleBlobDetector:
+    """
+    Set the parameters for the blob detector.
+
+    Args:
+        scale (float, optional): Factor the frames have been resized by. Defaults to 1.0.
+
+    Returns:
+        SimpleBlobDetector
+    """
+    # Blob detector parameters
+    params = cv.SimpleBlobDetector_Params()
+    params.filterByInertia = False
+    params.filterByConvexity = False
+    params.filterByColor = True
+    params.blobColor = 255
+    params.filterByArea = True
+    params.minArea = 16 * scale**2
+
+    return cv.SimpleBlobDetector_create(params)
+
+
+def rescale_keypoints(
+    blobs: Sequence[cv.KeyPoint],
+    scale: float,
+    offset: tuple[int, int] = (0, 0),
+    origin: tuple[int, int] = (0, 0),
+) -> Sequence[cv.KeyPoint]:
+    """
+    Convert keypoints detected in a resized, cropped frame back to full resolution coordinates.
+
+    Args:
+        blobs (Sequence[KeyPoint]): Keypoints in the resized frame.
+        scale (float): Factor the frame was resized by.
+        offset (tuple[int, int], optional): Position of the crop in the full frame. Defaults to (0, 0).
+        origin (tuple[int, int], optional): Position of the part of the resized frame the keypoints were
+            detected in. Defaults to (0, 0).
+
+    Returns:
+        Sequence[KeyPoint]: Keypoints in full resolution pixels.
+    """
+    if scale == 1 and offset == (0, 0) and origin == (0, 0):
+        return blobs
+
+    x0, y0 = offset
+    u0, v0 = origin
+    # Scale about pixel centres
+    return tuple(
+        cv.KeyPoint(
+            x=(blob.pt[0] + u0 + 0.5) / scale - 0.5 + x0,
+            y=(blob.pt[1] + v0 + 0.5) / scale - 0.5 + y0,
+            size=blob.size / scale,
+            angle=blob.angle,
+            response=blob.response,
+            octave=blob.octave,
+            class_id=blob.class_id,
+        )
+        for blob in blobs
+    )
+
+
+def check_roi(roi: cv.typing.MatLike) -> None:
+    """
+    Check a region of interest mask covers some of the frame.
+
+    Args:
+        roi (MatLike): Binary mask of the region to detect objects in.
+    """
+    if cv.countNonZero(roi) == 0:
+        raise ValueError("The region of interest is empty")
+
+
+class FrameProcessor:
+    """
+    Detects objects in the frames of one video, reusing kernels and image buffers between frames.
+    """
+
+    def __init__(
+        self,
+        scale: float = 1.0,
+        roi: cv.typing.MatLike | None = None,
+        fast_close: bool = False,
+        motion_gate: bool = False,
+        gate_fraction: float = GATE_MIN_FRACTION,
+    ) -> None:
+        """
+        Initialise class.
+
+        Args:
+            scale (float, optional): Factor to resize frames by before detection. Defaults to 1.0.
+            roi (MatLike, optional): Binary mask of the region to detect objects in. Defaults to None (whole frame).
+            fast_close (bool, optional): Approximate the elliptical closing kernel with a rectangle, which OpenCV
+                applies as separate row and column passes. Defaults to False.
+            motion_gate (bool, optional): Skip segmentation and blob detection on frames with no motion, which
+                are cheaply found by comparing a downscaled frame with a running average. Defaults to False.
+            gate_fraction (float, optional): Smallest fraction of the gated area which must change for a frame
+                to count as having motion. Defaults to `GATE_MIN_FRACTION`.
+        """
+        self.scale = scale
+        self.background_subtractor = cv.createBackgroundSubtractorMOG2()
+        self.blob_detector = setup_blob_detector(scale)
+        self.open_kernel = cv.getStructuringElement(
+            cv.MORPH_ELLIPSE, scaled_kernel_size(5, scale)
+        )
+        self.close_kernel = cv.getStructuringElement(
+            cv.MORPH_RECT if fast_close else cv.MORPH_ELLIPSE,
+            scaled_kernel_size(25, scale),
+        )
+
+        self.offset = (0, 0)
+        self.crop = (slice(None), slice(None))
+        self.roi = roi
+        if roi is not None:
+            check_roi(roi)
+            # Only segment the part of the frame the region covers
+            x0, y0, width, height = cv.boundingRect(roi)
+            self.offset = (x0, y0)
+            self.crop = (slice(y0, y0 + height), slice(x0, x0 + width))
+            self.roi = roi[self.crop]
+            if scale != 1:
+                self.roi = cv.resize(
+                    self.roi, None, fx=scale, fy=scale, interpolation=cv.INTER_NEAREST
+                )
+
+        self.motion_gate = motion_gate
+        self.gate_fraction = gate_fraction
+        self.gate_min_pixels = 1
+        self.frames = 0
+        self.gated_frames = 0
+        self.gate_roi = None
+        if motion_gate and roi is not None:
+            self.gate_roi = cv.resize(
+                roi[self.crop],
+                None,
+                fx=GATE_SCALE,
+                fy=GATE_SCALE,
+                interpolation=cv.INTER_NEAREST,
+            )
+
+        # Allocated on the first frame, once the size is known
+        self.resized = None
+        self.foreground_mask = None
+        self.gate_small = None
+        self.gate_gray = None
+        self.gate_reference = None
+        self.gate_reference_gray = None
+        self.gate_difference = None
+
+    def allocate_buffers(self, frame: cv.typing.MatLike) -> None:
+        """
+        Allocate the image buffers used for each frame.
+
+        Args:
+            frame (MatLike): Cropped frame at full resolution.
+        """
+        height, width = frame.shape[0:2]
+        if self.scale != 1:
+            width, height = round(width * self.scale), round(height * self.scale)
+            self.resized = np.empty((height, width, *frame.shape[2:]), frame.dtype)
+        self.foreground_mask = np.empty((height, width), np.uint8)
+        if self.motion_gate:
+            height, width = frame.shape[0:2]
+            width, height = round(width * GATE_SCALE), round(height * GATE_SCALE)
+            self.gate_small = np.empty((height, width, *frame.shape[2:]), frame.dtype)
+            self.gate_gray = np.empty((height, width), np.uint8)
+            self.gate_reference_gray = np.empty((height, width), np.uint8)
+            self.gate_difference = np.empty((height, width), np.uint8)
+            area = height * width
+            if self.gate_roi is not None:
+                area = cv.countNonZero(self.gate_roi)
+            self.gate_min_pixels = max(1, round(self.gate_fraction * area))
+
+    def clean_mask(self, mask: cv.typing.MatLike) -> cv.typing.MatLike:
+        """
+        Perform opening and closing on the forground mask to remove noise and join fragmented objects.
+
+        Args:
+            mask (MatLike): The forground mask to be cleaned. Overwritten with the result.
+
+        Returns:
+            MatLike: Cleaned foreground mask.
+        """
+        # Both are done in place, a separate output buffer only adds another pass over memory
+        cv.morphologyEx(mask, cv.MORPH_OPEN, self.open_kernel, dst=mask)
+        return cv.morphologyEx(mask, cv.MORPH_CLOSE, self.close_kernel, dst=mask)
+
+    def learn_background(self, frame: cv.typing.MatLike) -> None:
+        """
+        Train the background model on a frame without detecting objects in it.
+
+        Args:
+            frame (MatLike): Frame to learn from.
+        """
+        frame = frame[self.crop]
+        if self.foreground_mask is None:
+            self.allocate_buffers(frame)
+        if self.scale != 1:
+            frame = cv.resize(
+                frame,
+                self.resized.shape[1::-1],
+                dst=self.resized,
+                interpolation=cv.INTER_AREA,
+            )
+        self.background_subtractor.apply(frame, fgmask=self.foreground_mask)
+
+    def has_motion(self, frame: cv.typing.MatLike) -> bool:
+        """
+        Check if anything has moved, by comparing a downscaled frame with a running average of previous frames.
+
+        Args:
+            frame (MatLike): Cropped frame at full resolution.
+
+        Returns:
+            bool: Whether enough pixels differ from the running average.
+        """
+        small = cv.resize(
+            frame,
+            self.gate_small.shape[1::-1],
+            dst=self.gate_small,
+            interpolation=cv.INTER_AREA,
+        )
+        if small.ndim == 3:
+            gray = cv.cvtColor(small, cv.COLOR_BGR2GRAY, dst=self.gate_gray)
+        else:
+            gray = small
+        if self.gate_reference is None:
+            self.gate_reference = gray.astype(np.float32)
+            return True
+
+        cv.convertScaleAbs(self.gate_reference, dst=self.gate_reference_gray)
+        cv.absdiff(gray, self.gate_reference_gray, dst=self.gate_difference)
+        if self.gate_roi is not None:
+            cv.bitwise_and(
+                self.gate_difference, self.gate_roi, dst=self.gate_difference
+            )
+        cv.threshold(
+            self.gate_difference,
+            GATE_PIXEL_THRESHOLD,
+            255,
+            cv.THRESH_BINARY,
+            dst=self.gate_difference,
+        )
+        moving = cv.countNonZero(self.gate_difference)
+        cv.accumulateWeighted(gray, self.gate_reference, GATE_REFERENCE_RATE)
+        return moving >= self.gate_min_pixels
+
+    def detect(self, frame: cv.typing.MatLike) -> Sequence[cv.KeyPoint]:
+        """
+        Detect objects a given video frame.
+
+        Args:
+            frame (MatLike): Frame to find objects in.
+
+        Returns:
+            Sequence[KeyPoint]: Coordinates of all objects detected in the frame, in full resolution pixels.
+        """
+        frame = frame[self.crop]
+        if self.foreground_mask is None:
+            self.allocate_buffers(frame)
+        self.frames += 1
+        gated = (
+            self.motion_gate
+            and not self.has_motion(frame)
+            and self.frames > GATE_WARM_UP_FRAMES
+        )
+        if gated:
+            self.gated_frames += 1
+            if self.gated_frames % GATE_REFRESH_INTERVAL != 0:
+                return ()
+        if self.scale != 1:
+            frame = cv.resize(
+                frame,
+                self.resized.shape[1::-1],
+                dst=self.resized,
+                interpolation=cv.INTER_AREA,
+            )
+
+        # Create FG mask for frame
+        self.background_subtractor.apply(frame, fgmask=self.foreground_mask)
+        if gated:
+            # Nothing moved, the frame was only needed to keep the background model up to date
+            return ()
+        if self.roi is not None:
+            cv.bitwise_and(self.foreground_mask, self.roi, dst=self.foreground_mask)
+        # Clean the mask to optimise object detection
+        foreground_mask = self.clean_mask(self.foreground_mask)
+
+        # The blob detector thresholds the mask many times, so it only searches the part with any
+        # foreground, plus a pixel of background so the outlines of blobs are unchanged
+        x, y, width, height = cv.boundingRect(foreground_mask)
+        if width == 0:
+            return ()
+        x0, y0 = max(x - 1, 0), max(y - 1, 0)
+        x1, y1 = x + width + 1, y + height + 1
+        blobs = self.blob_detector.detect(foreground_mask[y0:y1, x0:x1])
+        return rescale_keypoints(blobs, self.scale, self.offset, (x0, y0))
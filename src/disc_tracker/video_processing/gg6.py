@@ -1,52 +1,63 @@
+import argparse
 import os
-from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterator, Sequence
 from typing import OrderedDict
 
 import cv2 as cv
 import numpy as np
+import numpy.typing as npt
 
+from disc_tracker.track_store import TrackStore
 from disc_tracker.video_processing import Tracker
+from disc_tracker.video_processing.archive import merge_tracks, save_track
+from disc_tracker.video_processing.checkpoint import (
+    checkpoint_key,
+    load_checkpoint,
+    save_checkpoint,
+)
+from disc_tracker.video_processing.detection_cache import (
+    DetectionRecorder,
+    detection_key,
+    iter_detections,
+    load_detections,
+)
+from disc_tracker.video_processing.frame_processor import (
+    GATE_MIN_FRACTION,
+    FrameProcessor,
+    check_roi,
+    rescale_keypoints,
+    scaled_kernel_size,
+    setup_blob_detector,
+)
+from disc_tracker.video_processing.pipeline import pipelined_map
+from disc_tracker.video_processing.segments import split_segments, stitch_segments
 from disc_tracker.video_processing.tracker import Object
+from disc_tracker.video_processing.video_reader import VideoReader
 
+CHANELS = ("left", "right")
 
-def cleanMask(mask: cv.typing.MatLike) -> cv.typing.MatLike:
+
+def cleanMask(mask: cv.typing.MatLike, scale: float = 1.0) -> cv.typing.MatLike:
     """
     Perform opening and closing on the forground mask to remove noise and join fragmented objects.
 
     Args:
         mask (MatLike): The forground mask to be cleaned.
+        scale (float, optional): Factor the frame has been resized by. Defaults to 1.0.
 
     Returns:
         MatLike: Cleaned foreground mask.
     """
-    kernel = cv.getStructuringElement(cv.MORPH_ELLIPSE, (5, 5))
+    kernel = cv.getStructuringElement(cv.MORPH_ELLIPSE, scaled_kernel_size(5, scale))
     mask = cv.morphologyEx(mask, cv.MORPH_OPEN, kernel)
 
-    kernel = cv.getStructuringElement(cv.MORPH_ELLIPSE, (25, 25))
+    kernel = cv.getStructuringElement(cv.MORPH_ELLIPSE, scaled_kernel_size(25, scale))
     mask = cv.morphologyEx(mask, cv.MORPH_CLOSE, kernel)
 
     return mask
 
 
-def setup_blob_detector() -> cv.SimpleBlobDetector:
-    """
-    Set the parameters for the blob detector.
-
-    Returns:
-        SimpleBlobDetector
-    """
-    # Blob detector parameters
-    params = cv.SimpleBlobDetector_Params()
-    params.filterByInertia = False
-    params.filterByConvexity = False
-    params.filterByColor = True
-    params.blobColor = 255
-    params.filterByArea = True
-    params.minArea = 16
-
-    return cv.SimpleBlobDetector_create(params)
-
-
 def load_video(directory: str, chanel: str) -> cv.VideoCapture:
     """
     Load the specified video chanel from the given directory.
@@ -67,27 +78,305 @@ def load_video(directory: str, chanel: str) -> cv.VideoCapture:
     return video
 
 
+def load_roi(directory: str, chanel: str) -> cv.typing.MatLike | None:
+    """
+    Load the region of interest mask for the specified video chanel from the given directory, if there is one.
+
+    Args:
+        directory (str): Path to the directory which may contain `roi/<chanel>.png`.
+        chanel (str): Video chanel. Either `left` or `right`.
+
+    Returns:
+        MatLike | None: Binary mask, non-zero where objects should be detected.
+    """
+    filepath = os.path.join(directory, "roi", f"{chanel}.png")
+    if not os.path.exists(filepath):
+        return None
+
+    return cv.imread(filepath, cv.IMREAD_GRAYSCALE)
+
+
+def scan_motion(
+    video: cv.VideoCapture, scale: float = 0.125, stride: int = 5
+) -> tuple[cv.typing.MatLike | None, npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """
+    Find where and when motion occurs in the video.
+
+    A cheap pass is made over the video at low resolution, skipping frames, and the video is
+    rewound afterwards. One pass gives both the region for `learn_roi` and the timeline for
+    `motion_timeline`.
+
+    Args:
+        video (VideoCapture): Input video.
+        scale (float, optional): Factor to resize frames by. Defaults to 0.125.
+        stride (int, optional): Only process every `stride`-th frame. Defaults to 5.
+
+    Returns:
+        tuple[MatLike | None, NDArray[int64], NDArray[float64]]: Low resolution mask, non-zero where
+            motion was seen (None if no frames were read), and the index of each processed frame and
+            the fraction of it which is foreground.
+    """
+    background_subtractor = cv.createBackgroundSubtractorMOG2(detectShadows=False)
+    activity = None
+    frame_indices = []
+    energy = []
+    frame_index = 0
+    while video.grab():
+        if frame_index % stride == 0:
+            _, frame = video.retrieve()
+            frame = cv.resize(
+                frame, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA
+            )
+            foreground_mask = background_subtractor.apply(frame)
+            frame_indices.append(frame_index)
+            # The first frame is entirely foreground while the model is empty
+            if activity is None:
+                activity = np.zeros_like(foreground_mask)
+                energy.append(0.0)
+            else:
+                cv.bitwise_or(activity, foreground_mask, dst=activity)
+                energy.append(np.count_nonzero(foreground_mask) / foreground_mask.size)
+        frame_index += 1
+    video.set(cv.CAP_PROP_POS_FRAMES, 0)
+
+    return (
+        activity,
+        np.array(frame_indices, dtype=np.int64),
+        np.array(energy, dtype=np.float64),
+    )
+
+
+def activity_roi(
+    video: cv.VideoCapture,
+    activity: cv.typing.MatLike | None,
+    scale: float = 0.125,
+    margin: int = 50,
+) -> cv.typing.MatLike | None:
+    """
+    Turn the low resolution motion mask from `scan_motion` into a region of interest.
+
+    Args:
+        video (VideoCapture): Input video, for its resolution.
+        activity (MatLike | None): Low resolution mask, non-zero where motion was seen.
+        scale (float, optional): Factor the mask was resized by. Defaults to 0.125.
+        margin (int, optional): Distance (pixels at full resolution) to grow the region by. Defaults to 50.
+
+    Returns:
+        MatLike | None: Binary mask, non-zero where motion was seen, or None (the whole frame) if
+            no motion was seen.
+    """
+    if activity is None or not activity.any():
+        return None
+
+    activity = cv.morphologyEx(
+        activity,
+        cv.MORPH_OPEN,
+        cv.getStructuringElement(cv.MORPH_ELLIPSE, scaled_kernel_size(5, scale)),
+    )
+    activity = cv.dilate(
+        activity,
+        cv.getStructuringElement(
+            cv.MORPH_ELLIPSE, scaled_kernel_size(2 * margin + 1, scale)
+        ),
+    )
+    size = (
+        int(video.get(cv.CAP_PROP_FRAME_WIDTH)),
+        int(video.get(cv.CAP_PROP_FRAME_HEIGHT)),
+    )
+    return cv.resize(activity, size, interpolation=cv.INTER_NEAREST)
+
+
+def learn_roi(
+    video: cv.VideoCapture, scale: float = 0.125, stride: int = 5, margin: int = 50
+) -> cv.typing.MatLike | None:
+    """
+    Learn a region of interest mask covering everywhere motion occurs in the video.
+
+    Args:
+        video (VideoCapture): Input video. Rewound afterwards.
+        scale (float, optional): Factor to resize frames by. Defaults to 0.125.
+        stride (int, optional): Only process every `stride`-th frame. Defaults to 5.
+        margin (int, optional): Distance (pixels at full resolution) to grow the region by. Defaults to 50.
+
+    Returns:
+        MatLike | None: Binary mask, non-zero where motion was seen, or None (the whole frame) if
+            no motion was seen.
+    """
+    activity, _, _ = scan_motion(video, scale, stride)
+    return activity_roi(video, activity, scale, margin)
+
+
+def motion_timeline(
+    video: cv.VideoCapture, scale: float = 0.125, stride: int = 5
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """
+    Measure how much motion there is throughout the video.
+
+    Args:
+        video (VideoCapture): Input video. Rewound afterwards.
+        scale (float, optional): Factor to resize frames by. Defaults to 0.125.
+        stride (int, optional): Only process every `stride`-th frame. Defaults to 5.
+
+    Returns:
+        tuple[NDArray[int64], NDArray[float64]]: Index of each processed frame and the fraction of
+            it which is foreground.
+    """
+    _, frame_indices, energy = scan_motion(video, scale, stride)
+    return frame_indices, energy
+
+
+def find_active_windows(
+    frame_indices: npt.NDArray[np.int64],
+    energy: npt.NDArray[np.float64],
+    padding: int = 30,
+    min_energy: float = 1e-4,
+) -> list[tuple[int, int]]:
+    """
+    Find the periods of the video with motion, e.g. the throws.
+
+    Args:
+        frame_indices (NDArray[int64]): Index of each frame in the timeline, from `motion_timeline`.
+        energy (NDArray[float64]): Fraction of each frame which is foreground, from `motion_timeline`.
+        padding (int, optional): Number of frames to extend each period by at either end. Defaults to 30.
+        min_energy (float, optional): Smallest fraction of foreground counted as motion. Defaults to 1e-4.
+
+    Returns:
+        list[tuple[int, int]]: First and last + 1 frame of each period, in order and not overlapping.
+    """
+    if len(energy) == 0:
+        return []
+
+    # Well above the usual level of noise, which is robustly estimated from the median
+    median = np.median(energy)
+    threshold = max(min_energy, median + 5 * np.median(np.abs(energy - median)))
+    active = frame_indices[energy > threshold]
+    # Each sample stands in for the frames up to the neighbouring samples
+    stride = frame_indices[1] - frame_indices[0] if len(frame_indices) > 1 else 1
+    windows = []
+    for frame_index in active.tolist():
+        start = max(0, frame_index - stride - padding)
+        stop = frame_index + stride + padding
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], stop)
+        else:
+            windows.append((start, stop))
+    return windows
+
+
+def read_windows(
+    video: cv.VideoCapture,
+    windows: Sequence[tuple[int, int]],
+    warm_up_frames: int = 100,
+) -> Iterator[tuple[int, cv.typing.MatLike, bool]]:
+    """
+    Read the frames in each window of the video, seeking past the frames in between.
+
+    Each window is preceded by up to `warm_up_frames` frames to train the background model on.
+
+    Args:
+        video (VideoCapture): Input video.
+        windows (Sequence[tuple[int, int]]): First and last + 1 frame of each window, in order.
+        warm_up_frames (int, optional): Number of frames to read before each window. Defaults to 100.
+
+    Yields:
+        tuple[int, MatLike, bool]: Index of each frame, the frame, and whether it is only for warming up.
+    """
+    position = 0
+    for start, stop in windows:
+        first = max(start - warm_up_frames, position)
+        if first != position:
+            video.set(cv.CAP_PROP_POS_FRAMES, first)
+        for frame_index in range(first, stop):
+            ret, frame = video.read()
+            if not ret:
+                return
+            yield frame_index, frame, frame_index < start
+        position = stop
+
+
+def read_frames(video: cv.VideoCapture) -> Iterator[cv.typing.MatLike]:
+    """
+    Read the frames of a video until the end of the file.
+
+    Args:
+        video (VideoCapture): Input video.
+
+    Yields:
+        MatLike: Each frame of the video.
+    """
+    while video.isOpened():
+        ret, frame = video.read()  # Read next frame
+        # Check if at end of file
+        if not ret:
+            print("End of file")
+            break
+        yield frame
+
+
+def warm_up(
+    video: cv.VideoCapture,
+    frame_processor: FrameProcessor,
+    frame_index: int,
+    warm_up_frames: int = 100,
+) -> None:
+    """
+    Seek to a frame, first training the background model on the frames before it.
+
+    Args:
+        video (VideoCapture): Input video.
+        frame_processor (FrameProcessor): Frame processor whose background model is trained.
+        frame_index (int): Index of the next frame to read.
+        warm_up_frames (int, optional): Number of frames to train the background model on. Defaults to 100.
+    """
+    start = max(0, frame_index - warm_up_frames)
+    video.set(cv.CAP_PROP_POS_FRAMES, start)
+    for _ in range(frame_index - start):
+        ret, frame = video.read()
+        if not ret:
+            break
+        frame_processor.learn_background(frame)
+
+
 def detect_objects(
     background_subtractor: cv.BackgroundSubtractorMOG2,
     blob_detector: cv.SimpleBlobDetector,
     frame: cv.typing.MatLike,
+    scale: float = 1.0,
+    roi: cv.typing.MatLike | None = None,
 ) -> Sequence[cv.KeyPoint]:
     """
     Detect objects a given video frame.
 
     Args:
         background_subtractor (cv.BackgroundSubtractorMOG2): Gaussian mixture model for background/foreground.
-        blob_detector (cv.SimpleBlobDetector): Blob detector.
+        blob_detector (cv.SimpleBlobDetector): Blob detector, set up for the same `scale`.
         frame (cv.typing.MatLike): Frame to find objects in.
+        scale (float, optional): Factor to resize the frame by before detection. Defaults to 1.0.
+        roi (MatLike, optional): Binary mask of the region to detect objects in. Defaults to None (whole frame).
 
     Returns:
-        Sequence[KeyPoint]: Coordinates of all objects detected in the frame
+        Sequence[KeyPoint]: Coordinates of all objects detected in the frame, in full resolution pixels.
     """
+    x0, y0 = 0, 0
+    if roi is not None:
+        check_roi(roi)
+        # Only segment the part of the frame the region covers
+        x0, y0, width, height = cv.boundingRect(roi)
+        frame = frame[y0 : y0 + height, x0 : x0 + width]
+        roi = roi[y0 : y0 + height, x0 : x0 + width]
+    if scale != 1:
+        frame = cv.resize(frame, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+        if roi is not None:
+            roi = cv.resize(roi, frame.shape[1::-1], interpolation=cv.INTER_NEAREST)
+
     foreground_mask = background_subtractor.apply(frame)  # Create FG mask for frame
+    if roi is not None:
+        foreground_mask = cv.bitwise_and(foreground_mask, roi)
     # Clean the mask to optimise object detection
-    foreground_mask = cleanMask(foreground_mask)
+    foreground_mask = cleanMask(foreground_mask, scale)
 
-    return blob_detector.detect(foreground_mask)  # Blob detection
+    blobs = blob_detector.detect(foreground_mask)  # Blob detection
+    return rescale_keypoints(blobs, scale, (x0, y0))
 
 
 def add_object_ids_to_frame(
@@ -119,79 +408,573 @@ def add_object_bbox_to_frame(
     Draw circles representing the location and size of all the objects detected in a frame.
 
     Args:
-        frame (MatLike): Input frame.
+        frame (MatLike): Input frame. Drawn on in place.
         blobs (Sequence[KeyPoint]): Coordinates of all objects in input frame.
 
     Returns:
         MatLike: Output frame.
     """
-    # Plot blob locations and show IDs over the video frame
+    # Plot blob locations and show IDs over the video frame, drawing in place
     return cv.drawKeypoints(
         image=frame,
         keypoints=blobs,
-        outImage=np.array([]),
+        outImage=frame,
         color=(0, 0, 255),
-        flags=cv.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS,
+        flags=cv.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS
+        | cv.DRAW_MATCHES_FLAGS_DRAW_OVER_OUTIMG,
     )
 
 
-def track_objects(video: cv.VideoCapture, chanel: str) -> OrderedDict[np.int64, Object]:
+def create_video_writer(video: cv.VideoCapture, filename: str) -> cv.VideoWriter:
+    """
+    Create a video writer matching the frame rate and resolution of the input video.
+
+    Args:
+        video (VideoCapture): Input video.
+        filename (str): Path to write the output video to.
+
+    Returns:
+        VideoWriter
+    """
+    size = (
+        int(video.get(cv.CAP_PROP_FRAME_WIDTH)),
+        int(video.get(cv.CAP_PROP_FRAME_HEIGHT)),
+    )
+    return cv.VideoWriter(
+        filename, cv.VideoWriter_fourcc(*"mp4v"), video.get(cv.CAP_PROP_FPS), size
+    )
+
+
+def track_objects(
+    video: cv.VideoCapture,
+    chanel: str,
+    headless: bool = False,
+    output_filename: str | None = None,
+    pipelined: bool = False,
+    scale: float = 1.0,
+    roi: cv.typing.MatLike | None = None,
+    fast_close: bool = False,
+    checkpoint_filename: str | None = None,
+    checkpoint_interval: int = 1000,
+    checkpoint_key: str | None = None,
+    motion_gate: bool = False,
+    gate_fraction: float = GATE_MIN_FRACTION,
+    windows: Sequence[tuple[int, int]] | None = None,
+    detections_filename: str | None = None,
+) -> OrderedDict[np.int64, Object]:
     """
     Detect and track objects in the loaded video.
 
     Args:
         video (VideoCapture): Input video.
         chanel (str): Name of video chanel.
+        headless (bool, optional): Don't display the annotated video. Defaults to False.
+        output_filename (str, optional): Write the annotated video to this file. Defaults to None.
+        pipelined (bool, optional): Decode, segment and track frames concurrently on separate threads.
+            Defaults to False.
+        scale (float, optional): Factor to resize frames by before detection. Defaults to 1.0.
+        roi (MatLike, optional): Binary mask of the region to detect objects in. Defaults to None (whole frame).
+        fast_close (bool, optional): Approximate the elliptical closing kernel with a rectangle. Defaults to False.
+        checkpoint_filename (str, optional): Periodically save the tracker to this file, and resume from it
+            if it already exists. Defaults to None (no checkpoints).
+        checkpoint_interval (int, optional): Number of frames between checkpoints. Defaults to 1000.
+        checkpoint_key (str, optional): Key of the video and settings, from `checkpoint.checkpoint_key`.
+            Checkpoints saved with a different key aren't resumed. Defaults to None.
+        motion_gate (bool, optional): Skip detection on frames with no motion. Defaults to False.
+        gate_fraction (float, optional): Smallest fraction of the frame, or region of interest, which must
+            change for the motion gate to count it as moving. Defaults to `GATE_MIN_FRACTION`.
+        windows (Sequence[tuple[int, int]], optional): Only track objects in these periods (first and
+            last + 1 frame), e.g. from `find_active_windows`. Defaults to None (the whole video).
+        detections_filename (str, optional): Save the keypoints detected in every frame to this file, so
+            objects can be tracked again with `track_detections` without the video. Not saved if tracking
+            is stopped early or resumed from a checkpoint. Defaults to None.
 
     Returns:
         OrderedDict[int64, Object]: Dictionary containing all of the objects tracked in the video.
     """
-    background_subtractor = (
-        cv.createBackgroundSubtractorMOG2()
-    )  # Initialise BG subtractor
-    blob_detector = setup_blob_detector()  # Initialise blob detector
-    tracker = Tracker()  # Initialise tracker
-    while video.isOpened():
-        ret, frame = video.read()  # Read next frame
-        # Check if at end of file
-        if not ret:
-            print("End of file")
-            break
+    # Initialise BG subtractor and blob detector
+    frame_processor = FrameProcessor(
+        scale=scale,
+        roi=roi,
+        fast_close=fast_close,
+        motion_gate=motion_gate,
+        gate_fraction=gate_fraction,
+    )
+    tracker = None
+    if checkpoint_filename is not None:
+        tracker = load_checkpoint(
+            checkpoint_filename,
+            checkpoint_key,
+            int(video.get(cv.CAP_PROP_FRAME_COUNT)),
+        )
+    if tracker is None:
+        tracker = Tracker()  # Initialise tracker
+    else:
+        # The tracker's clock is the index of the next frame to process
+        print(f"Resuming from frame {tracker.current_time}")
+        if windows is None:
+            warm_up(video, frame_processor, tracker.current_time)
+    last_checkpoint = tracker.current_time
+    writer = None
+    if output_filename is not None:
+        writer = create_video_writer(video, output_filename)
+    # Detections are only complete if tracking starts from the beginning
+    recorder = None
+    if detections_filename is not None and tracker.current_time == 0:
+        recorder = DetectionRecorder()
+    # Only annotate frames if someone is going to see them
+    annotate = not headless or writer is not None
+    stopped = False
+    reader = None
+    if windows is None and pipelined:
+        frames = (
+            (frame_index, frame, False)
+            for frame_index, frame in enumerate(
+                read_frames(video), start=tracker.current_time
+            )
+        )
+    elif windows is None:
+        # Decodes ahead while the previous frame is processed. Frames are reused, which is safe as
+        # each is finished with before the next is read.
+        reader = VideoReader(video)
+        reading = iter(reader)
+        frames = ((frame_index, frame, False) for frame_index, _, frame in reading)
+    else:
+        windows = [
+            (max(start, tracker.current_time), stop)
+            for start, stop in windows
+            if stop > tracker.current_time
+        ]
+        frames = read_windows(video, windows)
+
+    def detect(item: tuple[int, cv.typing.MatLike, bool]) -> Sequence[cv.KeyPoint]:
+        _, frame, warming_up = item
+        if warming_up:
+            frame_processor.learn_background(frame)
+            return ()
+        return frame_processor.detect(frame)
+
+    if pipelined:
+        detections = pipelined_map(frames, detect)
+    else:
+        detections = ((item, detect(item)) for item in frames)
+
+    # The decoder thread waits on a full ring until the reader is closed, so it is closed even if
+    # detection or tracking raises
+    try:
+        for (frame_index, frame, warming_up), blobs in detections:
+            if warming_up:
+                continue
+            if recorder is not None:
+                recorder.add(frame_index, blobs)
+            # Skip over any frames between windows
+            tracker.advance_to(frame_index)
+            # Update the tracker with the (x,y) coords of each blob in the frame. Frames without blobs
+            # still advance the tracker's clock, keeping it in step with the frame number.
+            tracks = tracker.update(
+                np.reshape(cv.KeyPoint_convert(blobs), (-1, 2)),
+                np.array([blob.size for blob in blobs]),
+            )
+            # Windows can skip many frames at once, so compare with the last save
+            if (
+                checkpoint_filename is not None
+                and tracker.current_time - last_checkpoint >= checkpoint_interval
+            ):
+                save_checkpoint(checkpoint_filename, tracker, checkpoint_key)
+                last_checkpoint = tracker.current_time
+            if blobs == ():
+                if writer is not None:
+                    writer.write(frame)
+                continue
+            if not annotate:
+                continue
+
+            add_object_bbox_to_frame(frame, blobs)
+            add_object_ids_to_frame(frame, tracks)
+
+            if writer is not None:
+                writer.write(frame)
+            if not headless:
+                cv.imshow(f"{chanel} camera", frame)
+                if cv.waitKey(25) == ord("q"):
+                    stopped = True
+                    break
+    finally:
+        detections.close()
+        if reader is not None:
+            reading.close()
 
-        blobs = detect_objects(background_subtractor, blob_detector, frame)
-        if blobs == ():
-            continue
-        # Update the tracker with the (x,y) coords of each blob in the frame
-        tracks = tracker.update(cv.KeyPoint_convert(blobs))
+    # Clean up
+    if reader is not None:
+        print(f"Reading {chanel} chanel, {reader.stall_summary()}")
+    if motion_gate:
+        print(
+            f"Skipped detection on {frame_processor.gated_frames} of "
+            f"{frame_processor.frames} frames without motion in {chanel} chanel"
+        )
+    if checkpoint_filename is not None:
+        save_checkpoint(
+            checkpoint_filename, tracker, checkpoint_key, complete=not stopped
+        )
+    if recorder is not None and not stopped:
+        recorder.save(detections_filename)
+    video.release()
+    if writer is not None:
+        writer.release()
+    if not headless:
+        cv.destroyAllWindows()
 
-        frame = add_object_bbox_to_frame(frame, blobs)
-        add_object_ids_to_frame(frame, tracks)
+    return tracker.objects
 
-        cv.imshow(f"{chanel} camera", frame)
-        if cv.waitKey(25) == ord("q"):
-            break
 
-    # Clean up
+def track_detections(
+    detections: dict[str, npt.NDArray], tracker: Tracker | None = None
+) -> OrderedDict[np.int64, Object]:
+    """
+    Track objects from the keypoints saved by `track_objects`, without decoding the video.
+
+    The result is the same as tracking the video, so the tracker can be retuned quickly.
+
+    Args:
+        detections (dict[str, NDArray]): Detections, from `load_detections`.
+        tracker (Tracker, optional): Tracker to track the objects with. Defaults to None (a new `Tracker`).
+
+    Returns:
+        OrderedDict[int64, Object]: Dictionary containing all of the objects tracked in the video.
+    """
+    if tracker is None:
+        tracker = Tracker()
+    for frame_index, points, sizes in iter_detections(detections):
+        tracker.advance_to(frame_index)
+        tracker.update(points, sizes.astype(np.float64))
+    return tracker.objects
+
+
+def track_segment(
+    directory: str,
+    chanel: str,
+    window: tuple[int, int],
+    roi: cv.typing.MatLike | None = None,
+    **options,
+) -> OrderedDict[np.int64, Object]:
+    """
+    Load the specified video chanel and track the objects in one period of it, e.g. in a worker process.
+
+    Args:
+        directory (str): Path to the directory containing the `video` sub-directory.
+        chanel (str): Video chanel to track. Either `left` or `right`.
+        window (tuple[int, int]): First and last + 1 frame of the period.
+        roi (MatLike, optional): Binary mask of the region to detect objects in. Defaults to None (whole frame).
+        **options: Keyword arguments for `track_objects`.
+
+    Returns:
+        OrderedDict[int64, Object]: Dictionary containing the objects tracked in the period.
+    """
+    video = load_video(directory, chanel)
+    # The background model is trained on the frames before the period
+    return track_objects(
+        video, chanel, headless=True, roi=roi, windows=[window], **options
+    )
+
+
+def track_segments(
+    directory: str,
+    chanel: str,
+    segments: int,
+    overlap: int = 100,
+    roi: cv.typing.MatLike | None = None,
+    workers: int | None = None,
+    **options,
+) -> OrderedDict[np.int64, Object]:
+    """
+    Track the objects in overlapping periods of the specified video chanel in parallel, then stitch them together.
+
+    Args:
+        directory (str): Path to the directory containing the `video` sub-directory.
+        chanel (str): Video chanel to track. Either `left` or `right`.
+        segments (int): Number of periods to split the video into.
+        overlap (int, optional): Number of frames each period shares with the previous one. Defaults to 100.
+        roi (MatLike, optional): Binary mask of the region to detect objects in. Defaults to None (whole frame).
+        workers (int, optional): Number of worker processes. Defaults to None (one per period, at most
+            one per CPU).
+        **options: Keyword arguments for `track_objects`.
+
+    Returns:
+        OrderedDict[int64, Object]: Dictionary containing all of the objects tracked in the video.
+    """
+    video = load_video(directory, chanel)
+    frame_count = int(video.get(cv.CAP_PROP_FRAME_COUNT))
     video.release()
-    cv.destroyAllWindows()
+    windows = split_segments(frame_count, segments, overlap)
+    if workers is None:
+        workers = min(len(windows), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(track_segment, directory, chanel, window, roi, **options)
+            for window in windows
+        ]
+        objects = [future.result() for future in futures]
+    return stitch_segments(objects, windows)
+
+
+def track_chanel(
+    directory: str,
+    chanel: str,
+    headless: bool = False,
+    output_filename: str | None = None,
+    pipelined: bool = False,
+    scale: float = 1.0,
+    auto_roi: bool = False,
+    fast_close: bool = False,
+    checkpoint: bool = False,
+    motion_gate: bool = False,
+    gate_fraction: float = GATE_MIN_FRACTION,
+    two_pass: bool = False,
+    segments: int = 1,
+    segment_workers: int | None = None,
+    cache_detections: bool = False,
+) -> OrderedDict[np.int64, Object]:
+    """
+    Load the specified video chanel and track the objects in it.
+
+    Everything needed for tracking is created here, so chanels can be tracked in separate processes.
+
+    Args:
+        directory (str): Path to the directory containing the `video` sub-directory.
+        chanel (str): Video chanel to track. Either `left` or `right`.
+        headless (bool, optional): Don't display the annotated video. Defaults to False.
+        output_filename (str, optional): Write the annotated video to this file. Defaults to None.
+        pipelined (bool, optional): Decode, segment and track frames concurrently on separate threads.
+            Defaults to False.
+        scale (float, optional): Factor to resize frames by before detection. Defaults to 1.0.
+        auto_roi (bool, optional): Learn the region of interest from the video if the directory
+            doesn't contain `roi/<chanel>.png`. Defaults to False.
+        fast_close (bool, optional): Approximate the elliptical closing kernel with a rectangle. Defaults to False.
+        checkpoint (bool, optional): Periodically save the tracker to `tracks/<chanel>.checkpoint`, resuming
+            from it if it exists. Defaults to False.
+        motion_gate (bool, optional): Skip detection on frames with no motion. Defaults to False.
+        gate_fraction (float, optional): Smallest fraction of the frame, or region of interest, which must
+            change for the motion gate to count it as moving. Defaults to `GATE_MIN_FRACTION`.
+        two_pass (bool, optional): First find the periods with motion with a quick pass over the video,
+            then only track objects in those. Defaults to False.
+        segments (int, optional): Split the video into this many overlapping periods, tracked in separate
+            processes without display. Can't be combined with `output_filename`, `checkpoint`, `two_pass`
+            or `cache_detections`. Defaults to 1.
+        segment_workers (int, optional): Number of processes to track the periods in. Defaults to None
+            (one per period, at most one per CPU).
+        cache_detections (bool, optional): Save the keypoints detected in every frame to `tracks/cache`,
+            and track objects from them instead of the video if neither it nor the detection settings
+            have changed. The video is still tracked if it is displayed, written or checkpointed.
+            Defaults to False.
+
+    Returns:
+        OrderedDict[int64, Object]: Dictionary containing all of the objects tracked in the video.
+    """
+    video = load_video(directory, chanel)
+    checkpoint_filename = None
+    if checkpoint:
+        checkpoint_filename = os.path.join(directory, "tracks", f"{chanel}.checkpoint")
+    roi = load_roi(directory, chanel)
+    learn = roi is None and auto_roi
+    if segments > 1 and (
+        output_filename is not None or checkpoint or two_pass or cache_detections
+    ):
+        raise ValueError(
+            "Segmented tracking can't write video, checkpoint, make two passes or cache detections"
+        )
+    # Everything other than the video and region of interest the detections depend on. A learned
+    # region only depends on the video, so whether it is learned stands in for it.
+    settings = {
+        "scale": scale,
+        "fast_close": fast_close,
+        "motion_gate": motion_gate,
+        "gate_fraction": gate_fraction if motion_gate else None,
+        "two_pass": two_pass,
+        "auto_roi": learn,
+    }
+    detections_filename = None
+    if cache_detections:
+        key = detection_key(
+            os.path.join(directory, "video", f"{chanel}.mp4"), settings, roi
+        )
+        detections_filename = os.path.join(
+            directory, "tracks", "cache", f"{chanel}_detections-{key}.npz"
+        )
+        # Cached detections have no frames to display, write or checkpoint, so the video is
+        # tracked again if any of those are needed
+        replay = headless and output_filename is None and not checkpoint
+        if replay and os.path.exists(detections_filename):
+            video.release()
+            print(f"Tracking objects for {chanel} chanel from cached detections...")
+            return track_detections(load_detections(detections_filename))
+    timeline = None
+    if learn or two_pass:
+        # The region and the periods with motion are both found in one quick pass
+        print(f"Finding motion in {chanel} chanel...")
+        activity, *timeline = scan_motion(video)
+        if learn:
+            roi = activity_roi(video, activity)
+    if segments > 1:
+        video.release()
+        print(f"Tracking objects for {chanel} chanel in {segments} segments...")
+        return track_segments(
+            directory,
+            chanel,
+            segments,
+            roi=roi,
+            workers=segment_workers,
+            pipelined=pipelined,
+            scale=scale,
+            fast_close=fast_close,
+            motion_gate=motion_gate,
+            gate_fraction=gate_fraction,
+        )
+    windows = None
+    if two_pass:
+        windows = find_active_windows(*timeline)
+        frame_count = int(video.get(cv.CAP_PROP_FRAME_COUNT))
+        active = sum(min(stop, frame_count) - start for start, stop in windows)
+        print(
+            f"Found {len(windows)} periods of motion in {chanel} chanel, "
+            f"covering {active} of {frame_count} frames"
+        )
+    key = checkpoint_key(video, settings, roi) if checkpoint else None
+    print(f"Tracking objects for {chanel} chanel...")
+    objects = track_objects(
+        video,
+        chanel,
+        headless=headless,
+        output_filename=output_filename,
+        pipelined=pipelined,
+        scale=scale,
+        roi=roi,
+        fast_close=fast_close,
+        checkpoint_filename=checkpoint_filename,
+        checkpoint_key=key,
+        motion_gate=motion_gate,
+        gate_fraction=gate_fraction,
+        windows=windows,
+        detections_filename=detections_filename,
+    )
+    if detections_filename is not None and os.path.exists(detections_filename):
+        # Detections cached for a previous video or settings can't be used again
+        cache_directory, current = os.path.split(detections_filename)
+        for entry in os.listdir(cache_directory):
+            if (
+                entry.startswith(f"{chanel}_detections-")
+                and entry.endswith(".npz")
+                and entry != current
+            ):
+                os.remove(os.path.join(cache_directory, entry))
+    return objects
+
+
+def add_tracking_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add command line options for the keyword arguments of `track_chanel`.
+
+    Args:
+        parser (ArgumentParser): Parser to add the options to.
+    """
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Decode, segment and track each chanel on separate threads.",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor to downscale frames by before detecting objects.",
+    )
+    parser.add_argument(
+        "--auto-roi",
+        action="store_true",
+        help="Learn the region of interest from the video if there is no roi/<chanel>.png.",
+    )
+    parser.add_argument(
+        "--fast-close",
+        action="store_true",
+        help="Approximate the elliptical closing kernel with a faster rectangular one.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Periodically save tracking progress and resume from it, e.g. after an interruption or appending footage.",
+    )
+    parser.add_argument(
+        "--motion-gate",
+        action="store_true",
+        help="Skip object detection on frames where nothing moves, e.g. before and after a throw.",
+    )
+    parser.add_argument(
+        "--gate-fraction",
+        type=float,
+        default=GATE_MIN_FRACTION,
+        help="Smallest fraction of the frame (or region of interest) which must change for the motion gate to let a frame through.",
+    )
+    parser.add_argument(
+        "--two-pass",
+        action="store_true",
+        help="Find the periods with motion with a quick low resolution pass, then only track those.",
+    )
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=1,
+        help="Split each chanel into this many overlapping periods, tracked in parallel processes.",
+    )
+    parser.add_argument(
+        "--cache-detections",
+        action="store_true",
+        help="Save the objects detected in each frame, and re-track from them instead of the video if nothing they depend on has changed.",
+    )
 
-    return tracks
+
+def tracking_options(args: argparse.Namespace) -> dict:
+    """
+    Get the keyword arguments for `track_chanel` from parsed command line options.
+
+    Args:
+        args (Namespace): Options parsed by a parser set up with `add_tracking_arguments`.
+
+    Returns:
+        dict: Keyword arguments for `track_chanel`.
+    """
+    return {
+        "pipelined": args.pipelined,
+        "scale": args.scale,
+        "auto_roi": args.auto_roi,
+        "fast_close": args.fast_close,
+        "checkpoint": args.checkpoint,
+        "motion_gate": args.motion_gate,
+        "gate_fraction": args.gate_fraction,
+        "two_pass": args.two_pass,
+        "segments": args.segments,
+        "cache_detections": args.cache_detections,
+    }
 
 
 def save_disc_track(
-    filename: str, tracks: OrderedDict[np.int64, Object], id: np.int64
+    filename: str,
+    tracks: OrderedDict[np.int64, Object],
+    id: np.int64 | Sequence[np.int64],
+    store: TrackStore | None = None,
+    key: tuple[str, str] | None = None,
 ) -> None:
     """
-    Write the track corresponding to the disc to file.
+    Write the track corresponding to the disc to file, and optionally append it to a track store.
 
     Args:
         filename (str): Name to save the file as.
         tracks (OrderedDict[int64, Object]): Dictonary of objects tracked in the video.
-        id (int64): ID of the object which is the disc.
+        id (int64 | Sequence[int64]): ID of the object which is the disc, or IDs of several objects
+            to join, in order of preference.
+        store (TrackStore, optional): Store to also append the track to. Defaults to None.
+        key (tuple[str, str], optional): Session and chanel of the track in the store. Defaults to None.
     """
-    np.savez(
-        filename,
-        x=tracks[id].track[:, 0],
-        y=tracks[id].track[:, 1],
-        t=tracks[id].track[:, 2],
-    )
+    if np.ndim(id) == 0:
+        track = tracks[id].track
+    else:
+        track = merge_tracks(tracks[i].track for i in id)
+    save_track(filename, track, store, key)
@@ -0,0 +1,109 @@
+import numpy as np
+import numpy.typing as npt
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter run over many objects at once.
+
+    Each row holds the state (x, y, vx, vy) and covariance of one object, so predicting or
+    correcting every live object is a single batched array operation.
+    """
+
+    def __init__(
+        self,
+        process_noise: float = 1.0,
+        measurement_noise: float = 1.0,
+        initial_velocity_variance: float = 1000.0,
+    ) -> None:
+        """
+        Initialise class.
+
+        Args:
+            process_noise (float, optional): Variance of the random acceleration (pixels/frame²). Defaults to 1.0.
+            measurement_noise (float, optional): Variance of a detected position (pixels²). Defaults to 1.0.
+            initial_velocity_variance (float, optional): Variance of the unknown velocity of a new object.
+                Defaults to 1000.0.
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.initial_velocity_variance = initial_velocity_variance
+        self.state = np.empty((0, 4), dtype=np.float64)
+        self.covariance = np.empty((0, 4, 4), dtype=np.float64)
+
+    @property
+    def positions(self) -> npt.NDArray[np.float64]:
+        """
+        NDArray[float64]: Current position estimate of every object.
+        """
+        return self.state[:, 0:2]
+
+    def add(self, positions: npt.NDArray[np.float64]) -> None:
+        """
+        Start filtering new objects, initially at rest at the given positions.
+
+        Args:
+            positions (NDArray[float64]): Coordinates of the new objects.
+        """
+        state = np.zeros((len(positions), 4))
+        state[:, 0:2] = positions
+        covariance = np.zeros((len(positions), 4, 4))
+        covariance[:, [0, 1], [0, 1]] = self.measurement_noise
+        covariance[:, [2, 3], [2, 3]] = self.initial_velocity_variance
+
+        self.state = np.concatenate([self.state, state])
+        self.covariance = np.concatenate([self.covariance, covariance])
+
+    def remove(self, keep: npt.NDArray[np.bool_]) -> None:
+        """
+        Stop filtering objects.
+
+        Args:
+            keep (NDArray[bool_]): Mask of the objects to keep.
+        """
+        self.state = self.state[keep]
+        self.covariance = self.covariance[keep]
+
+    def predict(self, dt: float = 1) -> npt.NDArray[np.float64]:
+        """
+        Advance every object by `dt` frames.
+
+        Args:
+            dt (float, optional): Number of frames to advance. Defaults to 1.
+
+        Returns:
+            NDArray[float64]: Predicted position of every object.
+        """
+        transition = np.eye(4)
+        transition[[0, 1], [2, 3]] = dt
+        # Discrete white noise acceleration model, applied independently to each axis
+        noise = np.zeros((4, 4))
+        noise[[0, 1], [0, 1]] = dt**4 / 4
+        noise[[0, 1, 2, 3], [2, 3, 0, 1]] = dt**3 / 2
+        noise[[2, 3], [2, 3]] = dt**2
+        noise *= self.process_noise
+
+        self.state = self.state @ transition.T
+        self.covariance = transition @ self.covariance @ transition.T + noise
+        return self.positions
+
+    def correct(
+        self, rows: npt.NDArray[np.int64], positions: npt.NDArray[np.float64]
+    ) -> None:
+        """
+        Update the state of the given objects with measured positions.
+
+        Args:
+            rows (NDArray[int64]): Indices of the objects that were measured.
+            positions (NDArray[float64]): Measured coordinates of those objects.
+        """
+        covariance = self.covariance[rows]
+        measurement_noise = self.measurement_noise * np.eye(2)
+        innovation_covariance = covariance[:, 0:2, 0:2] + measurement_noise
+        # Kalman gain K = P Hᵀ S⁻¹, computed as (S⁻¹ H P)ᵀ since P and S are symmetric
+        gain = np.linalg.solve(innovation_covariance, covariance[:, 0:2, :])
+        gain = gain.transpose(0, 2, 1)
+        innovation = positions - self.state[rows, 0:2]
+
+        self.state[rows] += np.einsum("nij,nj->ni", gain, innovation)
+        self.covariance[rows] = covariance - gain @ covariance[:, 0:2, :]
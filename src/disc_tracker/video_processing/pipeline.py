@@ -0,0 +1,118 @@
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+# Marks the end of a stage's output
+_END = object()
+
+
+class _StageError:
+    """
+    Wrapper passing an exception raised in a stage down the pipeline to be re-raised.
+    """
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _put(output: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """
+    Put an item on a bounded queue, giving up if the pipeline is stopped.
+
+    Args:
+        output (Queue): Queue to put the item on.
+        item (Any): Item to put.
+        stop (Event): Set when the pipeline is shutting down.
+
+    Returns:
+        bool: Whether the item was put on the queue.
+    """
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _source(items: Iterable, output: queue.Queue, stop: threading.Event) -> None:
+    """
+    Feed the items of an iterable into the pipeline.
+    """
+    try:
+        for item in items:
+            if not _put(output, item, stop):
+                return
+    except BaseException as error:
+        _put(output, _StageError(error), stop)
+        return
+    _put(output, _END, stop)
+
+
+def _map(
+    function: Callable[[Any], Any],
+    input: queue.Queue,
+    output: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    """
+    Apply a function to each item from the previous stage, preserving their order.
+    """
+    while not stop.is_set():
+        try:
+            item = input.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _END or isinstance(item, _StageError):
+            _put(output, item, stop)
+            return
+        try:
+            result = function(item)
+        except BaseException as error:
+            _put(output, _StageError(error), stop)
+            return
+        if not _put(output, (item, result), stop):
+            return
+
+
+def pipelined_map(
+    items: Iterable, function: Callable[[Any], Any], queue_size: int = 8
+) -> Iterator[tuple[Any, Any]]:
+    """
+    Lazily apply a function to each item, producing the items and the function on separate threads.
+
+    The producer and the function run concurrently with the consumer, connected by bounded queues,
+    so e.g. decoding, segmentation and tracking of a video overlap. OpenCV releases the GIL in its
+    heavy calls, so the stages run on separate cores. Items are passed between threads by reference,
+    so frames are never copied, and results are yielded in the same order as the items.
+
+    Args:
+        items (Iterable): Items to process, e.g. video frames. Iterated on a background thread.
+        function (Callable[[Any], Any]): Function to apply to each item.
+        queue_size (int, optional): Maximum number of items buffered between stages. Defaults to 8.
+
+    Yields:
+        tuple[Any, Any]: Each item and the result of applying the function to it.
+    """
+    stop = threading.Event()
+    source_output = queue.Queue(maxsize=queue_size)
+    map_output = queue.Queue(maxsize=queue_size)
+    threads = [
+        threading.Thread(target=_source, args=(items, source_output, stop)),
+        threading.Thread(target=_map, args=(function, source_output, map_output, stop)),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while (item := map_output.get()) is not _END:
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        # Stops the stages if the consumer finishes early
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+from typing import OrderedDict
+
+import numpy as np
+from scipy import optimize
+from scipy.spatial import cKDTree
+
+from disc_tracker.video_processing.tracker import Object
+
+
+def split_segments(
+    frame_count: int, segments: int, overlap: int = 100
+) -> list[tuple[int, int]]:
+    """
+    Split a video into consecutive periods which can be tracked independently.
+
+    Each period after the first starts `overlap` frames before the end of the previous one, so
+    objects seen by both can be matched up when the periods are stitched back together.
+
+    Args:
+        frame_count (int): Number of frames in the video.
+        segments (int): Number of periods to split the video into.
+        overlap (int, optional): Number of frames each period shares with the previous one. Defaults to 100.
+
+    Returns:
+        list[tuple[int, int]]: First and last + 1 frame of each period, in order.
+    """
+    boundaries = np.linspace(0, frame_count, max(segments, 1) + 1).round().astype(int)
+    return [
+        (max(0, start - overlap) if i > 0 else 0, stop)
+        for i, (start, stop) in enumerate(zip(boundaries[:-1], boundaries[1:]))
+    ]
+
+
+def match_segments(
+    previous: OrderedDict[np.int64, Object],
+    following: OrderedDict[np.int64, Object],
+    start: int,
+    stop: int,
+    max_distance: float = 2.0,
+    min_matches: int = 3,
+) -> dict[int, int]:
+    """
+    Match the objects tracked in two periods of a video, from their detections in the frames both cover.
+
+    Args:
+        previous (OrderedDict[int64, Object]): Objects tracked in the earlier period.
+        following (OrderedDict[int64, Object]): Objects tracked in the later period.
+        start (int): First frame covered by both periods.
+        stop (int): Last + 1 frame covered by both periods.
+        max_distance (float, optional): Furthest apart (pixels) two detections in the same frame can be
+            and still be the same. Defaults to 2.0.
+        min_matches (int, optional): Fewest frames two objects must agree in to be matched. Defaults to 3.
+
+    Returns:
+        dict[int, int]: ID in the earlier period of each matched object in the later period.
+    """
+
+    def overlapping(objects):
+        ids, rows = [], []
+        for id, o in objects.items():
+            track = o.track
+            track = track[(track[:, 2] >= start) & (track[:, 2] < stop)]
+            ids.append(np.full(len(track), id, dtype=np.int64))
+            rows.append(track)
+        return np.concatenate(ids or [np.empty(0, dtype=np.int64)]), np.concatenate(
+            rows or [np.empty((0, 3))]
+        )
+
+    previous_ids, previous_rows = overlapping(previous)
+    following_ids, following_rows = overlapping(following)
+    if len(previous_rows) == 0 or len(following_rows) == 0:
+        return {}
+
+    # Stretching time keeps detections in different frames out of range of each other
+    stretch = np.array([1.0, 1.0, 2.0 * max_distance + 1.0])
+    pairs = cKDTree(previous_rows * stretch).sparse_distance_matrix(
+        cKDTree(following_rows * stretch), max_distance, output_type="ndarray"
+    )
+    if pairs.size == 0:
+        return {}
+
+    # Number of frames each pair of objects agree in
+    previous_index, i = np.unique(previous_ids[pairs["i"]], return_inverse=True)
+    following_index, j = np.unique(following_ids[pairs["j"]], return_inverse=True)
+    agreement = np.zeros((len(previous_index), len(following_index)), dtype=np.int64)
+    np.add.at(agreement, (i, j), 1)
+
+    rows, cols = optimize.linear_sum_assignment(agreement, maximize=True)
+    matched = agreement[rows, cols] >= min_matches
+    return dict(
+        zip(
+            following_index[cols[matched]].tolist(),
+            previous_index[rows[matched]].tolist(),
+        )
+    )
+
+
+def stitch_segments(
+    segments: Sequence[OrderedDict[np.int64, Object]],
+    windows: Sequence[tuple[int, int]],
+    max_distance: float = 2.0,
+    min_matches: int = 3,
+) -> OrderedDict[np.int64, Object]:
+    """
+    Join the objects tracked in each period of a video into one set of objects, as if tracked in one go.
+
+    Objects matched across the overlap between periods keep the ID they were given first. Each
+    period only contributes its detections after the end of the previous period, since the
+    previous period has the better trained background model there.
+
+    Args:
+        segments (Sequence[OrderedDict[int64, Object]]): Objects tracked in each period, in order.
+        windows (Sequence[tuple[int, int]]): First and last + 1 frame of each period, from `split_segments`.
+        max_distance (float, optional): Furthest apart (pixels) two detections in the same frame can be
+            and still be the same. Defaults to 2.0.
+        min_matches (int, optional): Fewest frames two objects must agree in to be matched. Defaults to 3.
+
+    Returns:
+        OrderedDict[int64, Object]: Dictionary containing all of the objects tracked in the video.
+    """
+    parts = OrderedDict()
+    previous_ids = {}
+    for k, (objects, (start, _)) in enumerate(zip(segments, windows)):
+        matches = {}
+        boundary = start
+        if k > 0:
+            boundary = windows[k - 1][1]
+            matches = match_segments(
+                segments[k - 1], objects, start, boundary, max_distance, min_matches
+            )
+        ids = {}
+        for id, o in objects.items():
+            track = o.track[o.track[:, 2] >= boundary]
+            if matches.get(id) in previous_ids:
+                stitched_id = previous_ids[matches[id]]
+            elif len(track) > 0:
+                stitched_id = len(parts)
+                parts[stitched_id] = []
+            else:
+                continue
+            ids[id] = stitched_id
+            parts[stitched_id].append((track, o.mean_size))
+        previous_ids = ids
+
+    stitched = OrderedDict()
+    for id, pieces in parts.items():
+        tracks = [track for track, _ in pieces]
+        lengths = np.array([len(track) for track in tracks], dtype=np.float64)
+        sizes = np.array([size for _, size in pieces])
+        known = ~np.isnan(sizes) & (lengths > 0)
+        mean_size = np.nan
+        if known.any():
+            mean_size = np.average(sizes[known], weights=lengths[known])
+        stitched[id] = Object.from_track(np.concatenate(tracks), mean_size)
+    return stitched
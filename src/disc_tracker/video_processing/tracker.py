@@ -2,13 +2,83 @@ import numpy as np
 import numpy.typing as npt
 
 from collections import OrderedDict
-from scipy.spatial import distance
+from scipy.sparse import coo_matrix, csgraph
+from scipy.spatial import cKDTree, distance
 from scipy import optimize
 
+from disc_tracker.video_processing.kalman import KalmanFilter
+
+
+def gated_assignment(
+    old_position: npt.NDArray[np.float64],
+    new_position: npt.NDArray[np.float64],
+    gate_radius: float,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Assign new positions to old positions, only considering pairs closer than the gate radius.
+
+    Candidate pairs are found with KD-trees and split into connected components, so each
+    component is solved as a small independent assignment problem.
+
+    Args:
+        old_position (NDArray[float64]): Coordinates of the existing objects.
+        new_position (NDArray[float64]): Coordinates of the detected objects.
+        gate_radius (float): Maximum distance between an object and a detection it is assigned to.
+
+    Returns:
+        tuple[NDArray[int64], NDArray[int64]]: Indices of the assigned old and new positions.
+    """
+    pairs = cKDTree(old_position).sparse_distance_matrix(
+        cKDTree(new_position), gate_radius, output_type="ndarray"
+    )
+    if pairs.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    n_old = len(old_position)
+    i, j, cost = pairs["i"], pairs["j"], pairs["v"]
+    graph = coo_matrix(
+        (np.ones_like(cost), (i, j + n_old)),
+        shape=(n_old + len(new_position),) * 2,
+    )
+    _, labels = csgraph.connected_components(graph, directed=False)
+    edge_labels = labels[i]
+
+    # Components containing a single candidate pair need no solve
+    single = np.bincount(edge_labels)[edge_labels] == 1
+    rows, cols = [i[single]], [j[single]]
+
+    order = np.argsort(edge_labels[~single], kind="stable")
+    i, j, cost, edge_labels = (a[~single][order] for a in (i, j, cost, edge_labels))
+    bounds = np.flatnonzero(np.diff(edge_labels)) + 1
+    for ci, cj, cc in zip(
+        np.split(i, bounds), np.split(j, bounds), np.split(cost, bounds)
+    ):
+        if ci.size == 0:
+            continue
+        old_index, ci = np.unique(ci, return_inverse=True)
+        new_index, cj = np.unique(cj, return_inverse=True)
+        # Pairs outside the gate get a cost high enough that they are only chosen when
+        # nothing else is possible, and are dropped afterwards
+        forbidden = gate_radius * (min(len(old_index), len(new_index)) + 1)
+        block = np.full((len(old_index), len(new_index)), forbidden)
+        block[ci, cj] = cc
+        r, c = optimize.linear_sum_assignment(block)
+        allowed = block[r, c] < forbidden
+        rows.append(old_index[r[allowed]])
+        cols.append(new_index[c[allowed]])
+
+    return np.concatenate(rows), np.concatenate(cols)
+
 
 class Object:
+    __slots__ = ("_track", "_length", "_size_total", "_size_count")
+
     def __init__(
-        self, creation_time: np.int64, position: npt.NDArray[np.int64]
+        self,
+        creation_time: np.int64,
+        position: npt.NDArray[np.int64],
+        size: float | None = None,
+        capacity: int = 16,
     ) -> None:
         """
         Initialise class.
@@ -16,109 +86,250 @@ class Object:
         Args:
             creation_time (int64): Time object id first used (frame number).
             position (NDArray[int64]): Coordinates of object.
+            size (float, optional): Diameter of the detected blob. Defaults to None (unknown).
+            capacity (int, optional): Number of track rows to preallocate. Defaults to 16.
+        """
+        # Columns are x, y and t. Rows beyond `_length` are unused capacity.
+        self._track = np.empty((max(capacity, 1), 3), dtype=np.float64)
+        self._length = 0
+        self._size_total = 0.0
+        self._size_count = 0
+        self.update_position(creation_time, position, size)
+
+    @classmethod
+    def from_track(
+        cls, track: npt.NDArray[np.float64], mean_size: float = np.nan
+    ) -> "Object":
         """
-        self.position = np.append(position, creation_time)
+        Create an object from an already recorded track, e.g. when joining the tracks of the same object.
 
-        self.track = self.position[None, :]
+        Args:
+            track (NDArray[float64]): Coordinates and times of the object (x, y, t), at least one row.
+            mean_size (float, optional): Mean diameter of the detected blobs. Defaults to NaN (unknown).
+
+        Returns:
+            Object
+        """
+        o = cls.__new__(cls)
+        o._track = np.array(track, dtype=np.float64)
+        o._length = len(o._track)
+        # Each detection counts as having the mean size
+        known = not np.isnan(mean_size)
+        o._size_count = o._length if known else 0
+        o._size_total = mean_size * o._size_count if known else 0.0
+        return o
+
+    @property
+    def position(self) -> npt.NDArray[np.float64]:
+        """
+        NDArray[float64]: Most recent coordinates and time of the object (x, y, t).
+        """
+        return self._track[self._length - 1]
+
+    @property
+    def track(self) -> npt.NDArray[np.float64]:
+        """
+        NDArray[float64]: View of all recorded coordinates and times of the object.
+        """
+        return self._track[: self._length]
+
+    @property
+    def mean_size(self) -> float:
+        """
+        float: Mean diameter of the blobs detected for the object, NaN if no sizes were given.
+        """
+        if self._size_count == 0:
+            return np.nan
+        return self._size_total / self._size_count
 
-    def update_position(self, time: np.int64, position: npt.NDArray[np.int64]) -> None:
+    def update_position(
+        self,
+        time: np.int64,
+        position: npt.NDArray[np.int64],
+        size: float | None = None,
+    ) -> None:
         """
         Update the position and track of the object with new coordinates.
 
         Args:
             time (int64): Time the update occures (frame number).
             position (npt.NDArray[np.int64]): Coordinates of the object.
+            size (float, optional): Diameter of the detected blob. Defaults to None (unknown).
         """
-        self.position = np.append(position, time)
-        self.track = np.vstack([self.track, self.position])
+        if size is not None:
+            self._size_total += size
+            self._size_count += 1
+        if self._length == self._track.shape[0]:
+            # Double the capacity so appending is amortised O(1)
+            grown = np.empty((2 * self._length, 3), dtype=np.float64)
+            grown[: self._length] = self._track
+            self._track = grown
+        row = self._track[self._length]
+        row[0:2] = position[0:2]
+        row[2] = time
+        self._length += 1
 
 
 class Tracker:
-    def __init__(self, max_disappeared=5000):
+    def __init__(self, max_disappeared=5000, gate_radius=None, predict_motion=False):
         """
         Initialise class.
 
         Args:
             max_disappeared (int, optional): Delete object after this many frames with no detection. Defaults to 5000.
+            gate_radius (float, optional): Maximum distance (pixels) an object can move between detections.
+                Detections further than this from every object are registered as new objects. Defaults to None (no gate).
+            predict_motion (bool, optional): Associate detections with positions predicted by a constant-velocity
+                Kalman filter rather than the last observed positions. Defaults to False.
         """
         self.next_id = 0
         self.current_time = 0
         self.objects = OrderedDict()
-        self.disappeared = OrderedDict()
         self.max_disappeared = max_disappeared
+        self.gate_radius = gate_radius
+        # Structure-of-arrays state of the live objects, one row per object
+        self.ids = np.empty(0, dtype=np.int64)
+        self.positions = np.empty((0, 2), dtype=np.float64)
+        self.disappeared_count = np.empty(0, dtype=np.int64)
+        self.kalman_filter = KalmanFilter() if predict_motion else None
+
+    @property
+    def disappeared(self) -> dict[int, int]:
+        """
+        dict[int, int]: Number of consecutive frames each object has gone undetected.
+        """
+        return dict(zip(self.ids.tolist(), self.disappeared_count.tolist()))
 
-    def register(self, position: npt.NDArray[np.int64]):
+    def register(
+        self,
+        position: npt.NDArray[np.int64],
+        size: npt.NDArray[np.float64] | None = None,
+    ):
         """
-        Register a new object.
+        Register one or more new objects.
 
         Args:
-            position (NDArray[int64]): Coordinates of the object.
+            position (NDArray[int64]): Coordinates of the object, or an (n, 2) array of coordinates
+                to register n objects at once.
+            size (NDArray[float64], optional): Diameters of the detected blobs. Defaults to None (unknown).
         """
-        self.objects[self.next_id] = Object(
-            creation_time=self.current_time, position=position
+        position = np.atleast_2d(position)[:, 0:2]
+        new_ids = np.arange(self.next_id, self.next_id + len(position))
+        sizes = [None] * len(position) if size is None else np.ravel(size).tolist()
+        for id, p, s in zip(new_ids.tolist(), position, sizes):
+            self.objects[id] = Object(
+                creation_time=self.current_time, position=p, size=s
+            )
+
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.positions = np.concatenate([self.positions, position])
+        self.disappeared_count = np.concatenate(
+            [self.disappeared_count, np.zeros(len(position), dtype=np.int64)]
         )
-        self.disappeared[self.next_id] = 0
-        self.next_id += 1
+        if self.kalman_filter is not None:
+            self.kalman_filter.add(position)
+        self.next_id += len(position)
+
+    def deregister(self, id: np.int64 | npt.NDArray[np.int64]):
+        """
+        Remove one or more objects.
+
+        Args:
+            id (int64 | NDArray[int64]): ID, or array of IDs, of the objects to remove.
+        """
+        keep = ~np.isin(self.ids, id)
+        for removed in self.ids[~keep].tolist():
+            del self.objects[removed]
+
+        self.ids = self.ids[keep]
+        self.positions = self.positions[keep]
+        self.disappeared_count = self.disappeared_count[keep]
+        if self.kalman_filter is not None:
+            self.kalman_filter.remove(keep)
+
+    def deregister_disappeared(self) -> None:
+        """
+        Remove all objects that have been undetected for more than `max_disappeared` frames.
+        """
+        expired = self.disappeared_count > self.max_disappeared
+        if expired.any():
+            self.deregister(self.ids[expired])
 
-    def deregister(self, id: np.int64):
+    def advance_to(self, time: np.int64) -> None:
         """
-        Remove an object.
+        Skip forward to a later frame, as if every frame in between had no detections.
 
         Args:
-            id (int64): ID of object to remove.
+            time (int64): Frame number to advance to. Nothing happens if it isn't later than `current_time`.
         """
-        del self.objects[id]
-        del self.disappeared[id]
+        skipped = time - self.current_time
+        if skipped <= 0:
+            return
+
+        self.disappeared_count += skipped
+        if self.kalman_filter is not None:
+            self.kalman_filter.predict(skipped)
+        self.deregister_disappeared()
+        self.current_time = time
 
     def update(
-        self, new_position: npt.NDArray[np.int64]
+        self,
+        new_position: npt.NDArray[np.int64],
+        new_size: npt.NDArray[np.float64] | None = None,
     ) -> OrderedDict[np.int64, Object]:
         """
         Update the positions of existing objects and register any new objects.
 
         Args:
             new_position (NDArray[int64]): Coordinates of all objects detected in the frame.
+            new_size (NDArray[float64], optional): Diameters of all objects detected in the frame.
+                Defaults to None (unknown).
 
         Returns:
             OrderedDict[int64, Object]: Dictionary of all tracked objects.
         """
-        if new_position.size == 0:
-            for id in self.disappeared.copy():
-                self.disappeared[id] += 1
+        # Assume every object is missing, then reset the counters of those matched below
+        self.disappeared_count += 1
+        if self.kalman_filter is None:
+            expected_position = self.positions
+        else:
+            expected_position = self.kalman_filter.predict()
 
-                if self.disappeared[id] > self.max_disappeared:
-                    self.deregister(id)
+        if new_position.size == 0:
+            self.deregister_disappeared()
             self.current_time += 1
             return self.objects
 
-        if len(self.objects) == 0:
-            for p in new_position:
-                self.register(p)
+        if self.ids.size == 0:
+            self.register(new_position, new_size)
         else:
-            ids = np.array([*self.objects])
-            old_position = np.vstack([o.position[0:2] for o in self.objects.values()])
-            # Jonker-Volgenant assignment using distance from old position as cost matrix
-            row, col = optimize.linear_sum_assignment(
-                distance.cdist(old_position, new_position)
-            )
+            if self.gate_radius is None:
+                # Jonker-Volgenant assignment using distance from expected position as cost matrix
+                row, col = optimize.linear_sum_assignment(
+                    distance.cdist(expected_position, new_position)
+                )
+            else:
+                row, col = gated_assignment(
+                    expected_position, new_position, self.gate_radius
+                )
 
-            for r, c in zip(row, col):
-                id = ids[r]
+            self.positions[row] = new_position[col]
+            self.disappeared_count[row] = 0
+            if self.kalman_filter is not None:
+                self.kalman_filter.correct(row, new_position[col])
+            for id, c in zip(self.ids[row].tolist(), col):
                 self.objects[id].update_position(
-                    time=self.current_time, position=new_position[c]
+                    time=self.current_time,
+                    position=new_position[c],
+                    size=None if new_size is None else new_size[c],
+                )
+
+            self.deregister_disappeared()
+            if col.size < len(new_position):
+                self.register(
+                    np.delete(new_position, col, axis=0),
+                    None if new_size is None else np.delete(new_size, col),
                 )
-                self.disappeared[id] = 0
-
-            ids = np.delete(ids, row)
-            if ids.size > 0:
-                for id in ids:
-                    self.disappeared[id] += 1
-                    if self.disappeared[id] > self.max_disappeared:
-                        self.deregister(id)
-            else:
-                unassigned_positions = np.delete(new_position, col, axis=0)
-                for position in unassigned_positions:
-                    self.register(position)
 
         self.current_time += 1
         return self.objects
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections.abc import Iterator
+
+import cv2 as cv
+
+
+class VideoReader:
+    """
+    Iterator over the frames of a video, decoded ahead on a background thread.
+
+    Frames are decoded into a fixed ring of reusable arrays, so no frame is allocated after the
+    ring fills. OpenCV releases the GIL while decoding, so decoding overlaps processing of the
+    frames already read. A yielded frame is only valid until `keep` more frames have been yielded,
+    after which its array is reused.
+
+    The number of times, and total time, each side spent waiting for the other is recorded: the
+    decoder stalls when the ring is full (processing is the bottleneck), and the consumer stalls
+    when it is empty (decoding is the bottleneck).
+    """
+
+    def __init__(
+        self, video: cv.VideoCapture, buffer_size: int = 8, keep: int = 1
+    ) -> None:
+        """
+        Initialise class.
+
+        Args:
+            video (VideoCapture): Input video, read from its current position.
+            buffer_size (int, optional): Number of frames in the ring. Defaults to 8.
+            keep (int, optional): Number of most recently yielded frames which aren't overwritten.
+                Defaults to 1.
+        """
+        if buffer_size <= keep:
+            raise ValueError("The buffer must be larger than the frames kept")
+        self.video = video
+        self.buffer_size = buffer_size
+        self.keep = keep
+        self.decode_stalls = 0
+        self.decode_wait = 0.0
+        self.consume_stalls = 0
+        self.consume_wait = 0.0
+
+    def __iter__(self) -> Iterator[tuple[int, float, cv.typing.MatLike]]:
+        """
+        Read the frames of the video until the end of the file.
+
+        Yields:
+            tuple[int, float, MatLike]: Index of each frame, its timestamp (ms) and the frame.
+        """
+        start = int(self.video.get(cv.CAP_PROP_POS_FRAMES))
+        frames = [None] * self.buffer_size
+        timestamps = [0.0] * self.buffer_size
+        condition = threading.Condition()
+        # Frames decoded and yielded so far, the last `keep` yielded are still in use
+        state = {"decoded": 0, "consumed": 0, "finished": False, "stop": False}
+        error = []
+
+        def ring_full() -> bool:
+            return state["decoded"] - state["consumed"] + self.keep >= self.buffer_size
+
+        def decode() -> None:
+            try:
+                while True:
+                    with condition:
+                        if ring_full() and not state["stop"]:
+                            self.decode_stalls += 1
+                            waited = time.perf_counter()
+                            condition.wait_for(lambda: not ring_full() or state["stop"])
+                            self.decode_wait += time.perf_counter() - waited
+                        if state["stop"]:
+                            return
+                        slot = state["decoded"] % self.buffer_size
+                    # Decodes into the slot's array, once it has been allocated
+                    ret, frame = self.video.read(frames[slot])
+                    with condition:
+                        if not ret:
+                            break
+                        frames[slot] = frame
+                        timestamps[slot] = self.video.get(cv.CAP_PROP_POS_MSEC)
+                        state["decoded"] += 1
+                        condition.notify_all()
+            except BaseException as e:
+                error.append(e)
+            with condition:
+                state["finished"] = True
+                condition.notify_all()
+
+        def frame_ready() -> bool:
+            return state["decoded"] > state["consumed"] or state["finished"]
+
+        thread = threading.Thread(target=decode)
+        thread.start()
+        try:
+            while True:
+                with condition:
+                    if not frame_ready():
+                        self.consume_stalls += 1
+                        waited = time.perf_counter()
+                        condition.wait_for(frame_ready)
+                        self.consume_wait += time.perf_counter() - waited
+                    if state["decoded"] == state["consumed"]:
+                        break
+                    slot = state["consumed"] % self.buffer_size
+                    item = (start + state["consumed"], timestamps[slot], frames[slot])
+                    state["consumed"] += 1
+                    condition.notify_all()
+                yield item
+            if error:
+                raise error[0]
+        finally:
+            # Stops the decoder if the consumer finishes early
+            with condition:
+                state["stop"] = True
+                condition.notify_all()
+            thread.join()
+
+    def stall_summary(self) -> str:
+        """
+        Describe how long decoding and processing waited for each other.
+
+        Returns:
+            str: Number of stalls and total time waiting on each side.
+        """
+        return (
+            f"decoding waited for processing {self.decode_stalls} times "
+            f"({self.decode_wait:.2f} s), processing waited for decoding "
+            f"{self.consume_stalls} times ({self.consume_wait:.2f} s)"
+        )
@@ -0,0 +1,75 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.video_processing.archive import TrackArchive, save_track_archive
+from disc_tracker.video_processing.disc_identification import (
+    score_objects,
+    score_tracks,
+)
+from disc_tracker.video_processing.tracker import Object
+
+
+def test_track_archive(tmp_path):
+    first = Object(0, np.array([1.0, 2.0]))
+    first.update_position(1, np.array([3.0, 4.0]))
+    first.update_position(3, np.array([7.0, 8.0]))
+    second = Object(2, np.array([5.0, 6.0]))
+    second.update_position(3, np.array([0.0, 0.0]))
+    filename = os.path.join(tmp_path, "left.tracks")
+    save_track_archive(filename, OrderedDict({4: first, 9: second}))
+
+    archive = TrackArchive(filename)
+
+    assert len(archive) == 2
+    assert 9 in archive
+    npt.assert_array_equal(archive.track(4), first.track)
+    npt.assert_array_equal(archive.track(9), second.track)
+    npt.assert_array_equal(
+        archive.merge([4, 9]),
+        np.array([[1.0, 2.0, 0], [3.0, 4.0, 1], [5.0, 6.0, 2], [7.0, 8.0, 3]]),
+    )
+
+
+def test_track_archive_empty(tmp_path):
+    filename = os.path.join(tmp_path, "left.tracks")
+    save_track_archive(filename, OrderedDict())
+
+    assert len(TrackArchive(filename)) == 0
+    assert TrackArchive(filename).merge([]).shape == (0, 3)
+
+
+def test_track_archive_sizes(tmp_path):
+    rng = np.random.default_rng(0)
+    objects = OrderedDict()
+    for id in range(4):
+        o = Object(0, rng.random(2) * 100, size=2.0 + id)
+        for t in range(1, 20):
+            o.update_position(t, rng.random(2) * 100, size=2.0 + id)
+        objects[id] = o
+    objects[4] = Object(0, np.array([1.0, 2.0]))
+    filename = os.path.join(tmp_path, "left.tracks")
+    save_track_archive(filename, objects)
+
+    archive = TrackArchive(filename)
+
+    assert archive.mean_size(3) == 5.0
+    assert np.isnan(archive.mean_size(4))
+    # The disc is chosen the same way as straight after tracking
+    assert score_tracks(archive.tracks(), archive.mean_sizes()) == score_objects(
+        objects
+    )
+
+
+def test_track_archive_without_sizes(tmp_path):
+    filename = os.path.join(tmp_path, "left.tracks")
+    with open(filename, "wb") as file:
+        for array in (np.array([7]), np.array([0, 2]), np.arange(6.0).reshape(3, 2)):
+            np.lib.format.write_array(file, array)
+
+    archive = TrackArchive(filename)
+
+    npt.assert_array_equal(archive.track(7), [[0, 2, 4], [1, 3, 5]])
+    assert np.isnan(archive.mean_size(7))
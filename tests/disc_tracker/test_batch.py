@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import disc_tracker
+from disc_tracker import batch
+from disc_tracker.track_store import TrackStore, session_name
+
+
+def make_session(directory):
+    os.makedirs(os.path.join(directory, "video"))
+    for chanel in ["left", "right"]:
+        with open(os.path.join(directory, "video", f"{chanel}.mp4"), "w") as file:
+            file.write("not a video")
+    with open(os.path.join(directory, "camera_settings.yaml"), "w") as file:
+        file.write("d: 4\n")
+
+
+def test_discover_sessions(tmp_path):
+    make_session(os.path.join(tmp_path, "b"))
+    make_session(os.path.join(tmp_path, "a", "throw_1"))
+    os.makedirs(os.path.join(tmp_path, "not_a_session", "video"))
+
+    assert batch.discover_sessions(tmp_path) == [
+        os.path.join(tmp_path, "a", "throw_1"),
+        os.path.join(tmp_path, "b"),
+    ]
+
+
+def test_is_up_to_date(tmp_path):
+    make_session(tmp_path)
+    assert not batch.is_up_to_date(tmp_path)
+
+    os.makedirs(os.path.join(tmp_path, "tracks"))
+    for path in batch.session_outputs(tmp_path):
+        open(path, "w").close()
+        os.utime(path, (0, 2e9))
+    assert batch.is_up_to_date(tmp_path)
+
+    os.utime(os.path.join(tmp_path, "camera_settings.yaml"), (0, 3e9))
+    assert not batch.is_up_to_date(tmp_path)
+
+
+def test_run_batch_reports_failures(tmp_path):
+    make_session(os.path.join(tmp_path, "throw_1"))
+
+    summary = batch.run_batch(str(tmp_path), workers=1)
+
+    assert summary[0]["status"] == "failed"
+    with open(os.path.join(tmp_path, batch.MANIFEST_FILENAME)) as file:
+        manifest = json.load(file)
+    assert manifest["sessions"] == summary
+
+
+def test_main_dispatches_subcommands(monkeypatch):
+    calls = []
+    monkeypatch.setattr(disc_tracker, "track", lambda args: calls.append(args))
+    monkeypatch.setattr(batch, "run", lambda args: calls.append(args))
+
+    disc_tracker.main(["batch", "/data", "-j", "2"])
+    disc_tracker.main(["/data/throw_1", "--headless"])
+    # A dataset named like a sub-command can still be tracked
+    disc_tracker.main(["track", "batch"])
+
+    assert [args.command for args in calls] == ["batch", "track", "track"]
+    assert calls[0].root == "/data" and calls[0].workers == 2
+    assert calls[1].directory == "/data/throw_1" and calls[1].headless
+    assert calls[2].directory == "batch"
+
+
+def test_track_displays_from_main_process(tmp_path, monkeypatch):
+    calls = []
+
+    def track_chanel(directory, chanel, headless, **options):
+        calls.append((chanel, headless, os.getpid()))
+        return {}
+
+    class Plot:
+        def __init__(self, directory):
+            pass
+
+        def save_figure(self):
+            pass
+
+        def show_figure(self):
+            pass
+
+    monkeypatch.setattr(disc_tracker.gg6, "track_chanel", track_chanel)
+    monkeypatch.setattr(disc_tracker.gg6, "save_disc_track", lambda *a, **k: None)
+    monkeypatch.setattr(disc_tracker, "select_disc", lambda *args: [])
+    monkeypatch.setitem(disc_tracker.PLOT_CLASS, "mpl", Plot)
+
+    disc_tracker.main([str(tmp_path), "-p", "mpl", "--auto-id"])
+
+    # Without --headless, the chanels are tracked one after another where windows work
+    assert calls == [("left", False, os.getpid()), ("right", False, os.getpid())]
+
+
+def test_run_batch_stores_skipped_sessions(tmp_path):
+    directory = os.path.join(tmp_path, "throw_1")
+    make_session(directory)
+    os.makedirs(os.path.join(directory, "tracks"))
+    for chanel in ["left", "right"]:
+        path = os.path.join(directory, "tracks", f"{chanel}.npz")
+        shutil.copy(os.path.join("data", "rosie_pull", "tracks", f"{chanel}.npz"), path)
+        os.utime(path, (0, 2e9))
+
+    summary = batch.run_batch(
+        str(tmp_path), workers=1, store=str(tmp_path / "season.store")
+    )
+
+    assert summary[0]["status"] == "skipped"
+    store = TrackStore(str(tmp_path / "season.store"))
+    assert store.query() == [
+        (session_name(directory), "left"),
+        (session_name(directory), "right"),
+    ]
+
+
+def test_run_batch_rejects_parallel_segmented_sessions(tmp_path):
+    make_session(os.path.join(tmp_path, "throw_1"))
+
+    with pytest.raises(ValueError):
+        batch.run_batch(str(tmp_path), workers=2, segments=4)
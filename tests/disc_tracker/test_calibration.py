@@ -0,0 +1,109 @@
+import os
+
+import cv2 as cv
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.deprojection import calibration as calibration_module
+from disc_tracker.deprojection.calibration import (
+    load_calibration,
+    save_calibration,
+    triangulate_points,
+)
+from disc_tracker.deprojection.disc_track import deproject_points
+
+RESOLUTION = [1280, 720]
+F = 1000.0
+D = 4.0
+
+
+def rig_calibration(angle: float = 0.0, distortion: list[float] | None = None) -> dict:
+    camera_matrix = [[F, 0, RESOLUTION[0] / 2], [0, F, RESOLUTION[1] / 2], [0, 0, 1]]
+    # Right camera is D to the right of the left camera, both turned inwards by `angle`
+    toe_in = cv.Rodrigues(np.array([0.0, np.radians(angle), 0.0]))[0]
+    rotation = toe_in @ toe_in
+    translation = -rotation @ np.array([D, 0.0, 0.0])
+    distortion = distortion or [0.0] * 5
+    return {
+        "resolution": RESOLUTION,
+        "camera_matrix_left": camera_matrix,
+        "distortion_left": [distortion],
+        "camera_matrix_right": camera_matrix,
+        "distortion_right": [distortion],
+        "rotation": rotation.tolist(),
+        "translation": translation.reshape(3, 1).tolist(),
+    }
+
+
+def load_rig(tmp_path, monkeypatch, **kwargs) -> dict:
+    monkeypatch.setattr(calibration_module, "CACHE_DIRECTORY", str(tmp_path / "cache"))
+    filename = str(tmp_path / "calibration.yaml")
+    save_calibration(filename, rig_calibration(**kwargs))
+    return {
+        "resolution": RESOLUTION,
+        "f": F,
+        "d": D,
+        "c": 1.8,
+        "h": 2.8,
+        "calibration": load_calibration(filename),
+    }
+
+
+def test_triangulate_parallel_rig_matches_formula(tmp_path, monkeypatch):
+    camera_settings = load_rig(tmp_path, monkeypatch)
+    rng = np.random.default_rng(0)
+    xl, zl = rng.uniform(-300, 300, (2, 50))
+    xr = xl - rng.uniform(100, 400, 50)
+
+    test_points = triangulate_points(xl, xr, zl, zl, camera_settings)
+
+    del camera_settings["calibration"]
+    expected = deproject_points(xl, xr, zl, zl, camera_settings)
+    npt.assert_allclose(np.column_stack(test_points), np.column_stack(expected))
+
+
+def test_triangulate_toed_in_rig_with_distortion(tmp_path, monkeypatch):
+    camera_settings = load_rig(
+        tmp_path, monkeypatch, angle=5.0, distortion=[-0.1, 0.05, 0.0, 0.0, 0.0]
+    )
+    calibration = camera_settings["calibration"]
+    rng = np.random.default_rng(0)
+    # Points in front of the left camera
+    points = np.column_stack(
+        [rng.uniform(-3, 3, 50), rng.uniform(-2, 2, 50), rng.uniform(10, 30, 50)]
+    )
+    projected = []
+    for side, pose in [
+        ("left", (np.zeros(3), np.zeros(3))),
+        (
+            "right",
+            (cv.Rodrigues(calibration["rotation"])[0], calibration["translation"]),
+        ),
+    ]:
+        image_points, _ = cv.projectPoints(
+            points,
+            *pose,
+            calibration[f"camera_matrix_{side}"],
+            calibration[f"distortion_{side}"],
+        )
+        projected.append(image_points.reshape(-1, 2) - np.array(RESOLUTION) / 2)
+    (xl, zl), (xr, zr) = projected[0].T, projected[1].T
+
+    x, y, z = triangulate_points(xl, xr, zl, zr, camera_settings)
+
+    # The 3D frame is aligned with the rectified cameras
+    rectified = points @ calibration["R1"].T
+    npt.assert_allclose(x, rectified[:, 0] - D / 2, atol=1e-3)
+    npt.assert_allclose(y, rectified[:, 2] - 1.8, atol=1e-3)
+    npt.assert_allclose(z, 2.8 - rectified[:, 1], atol=1e-3)
+
+
+def test_rectification_is_cached(tmp_path, monkeypatch):
+    load_rig(tmp_path, monkeypatch)
+    assert len(os.listdir(tmp_path / "cache" / "rectification")) == 1
+
+    def fail(calibration):
+        raise AssertionError("Rectification wasn't cached")
+
+    monkeypatch.setattr(calibration_module, "rectify", fail)
+    load_calibration(str(tmp_path / "calibration.yaml"))
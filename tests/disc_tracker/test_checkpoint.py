@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.video_processing.checkpoint import load_checkpoint, save_checkpoint
+from disc_tracker.video_processing.tracker import Tracker
+
+
+def test_checkpoint_resumes_tracker(tmp_path):
+    filename = os.path.join(tmp_path, "left.checkpoint")
+    assert load_checkpoint(filename) is None
+
+    test_tracker = Tracker(predict_motion=True)
+    test_tracker.update(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    test_tracker.update(np.array([[1.1, 2.1]]))
+    save_checkpoint(filename, test_tracker)
+    test_tracker.update(np.array([[1.2, 2.2], [3.2, 4.2]]))
+
+    resumed_tracker = load_checkpoint(filename)
+    resumed_tracker.update(np.array([[1.2, 2.2], [3.2, 4.2]]))
+
+    assert resumed_tracker.current_time == 3
+    assert resumed_tracker.next_id == test_tracker.next_id
+    assert resumed_tracker.disappeared == test_tracker.disappeared
+    for id, test_object in test_tracker.objects.items():
+        npt.assert_array_equal(resumed_tracker.objects[id].track, test_object.track)
+
+
+def test_checkpoint_key_and_completion(tmp_path):
+    filename = os.path.join(tmp_path, "left.checkpoint")
+    test_tracker = Tracker()
+    test_tracker.update(np.array([[1.0, 2.0]]))
+    save_checkpoint(filename, test_tracker, key="a")
+
+    assert load_checkpoint(filename, key="b") is None
+    assert load_checkpoint(filename, key="a").current_time == 1
+
+    save_checkpoint(filename, test_tracker, key="a", complete=True)
+    assert load_checkpoint(filename, key="a", frame_count=1) is None
+    # Footage has been appended since
+    assert load_checkpoint(filename, key="a", frame_count=5).current_time == 1
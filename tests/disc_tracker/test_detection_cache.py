@@ -0,0 +1,46 @@
+import cv2 as cv
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.video_processing.detection_cache import (
+    DetectionRecorder,
+    detection_key,
+    iter_detections,
+    load_detections,
+)
+
+
+def test_detections_round_trip(tmp_path):
+    frames = {
+        3: [cv.KeyPoint(1.5, 2.5, 7.0), cv.KeyPoint(10.0, 20.0, 5.0)],
+        4: [],
+        9: [cv.KeyPoint(3.0, 4.0, 6.5)],
+    }
+    recorder = DetectionRecorder()
+    for frame_index, blobs in frames.items():
+        recorder.add(frame_index, blobs)
+    filename = str(tmp_path / "cache" / "left_detections.npz")
+    recorder.save(filename)
+
+    detections = load_detections(filename)
+
+    npt.assert_array_equal(detections["offsets"], [0, 2, 2, 3])
+    for (frame_index, points, sizes), (expected_index, blobs) in zip(
+        iter_detections(detections), frames.items()
+    ):
+        assert frame_index == expected_index
+        npt.assert_array_equal(points, np.reshape(cv.KeyPoint_convert(blobs), (-1, 2)))
+        npt.assert_array_equal(sizes, [blob.size for blob in blobs])
+
+
+def test_detection_key(tmp_path):
+    video_filename = tmp_path / "left.mp4"
+    video_filename.write_bytes(b"video")
+    key = detection_key(str(video_filename), {"scale": 1.0})
+
+    assert detection_key(str(video_filename), {"scale": 1.0}) == key
+    assert detection_key(str(video_filename), {"scale": 0.5}) != key
+    roi = np.zeros((4, 4), np.uint8)
+    assert detection_key(str(video_filename), {"scale": 1.0}, roi) != key
+    video_filename.write_bytes(b"other video")
+    assert detection_key(str(video_filename), {"scale": 1.0}) != key
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import disc_tracker
+from disc_tracker.video_processing.disc_identification import (
+    identify_disc,
+    score_objects,
+)
+from disc_tracker.video_processing.tracker import Object
+
+
+def make_object(positions, sizes, start=0):
+    test_object = Object(start, positions[0], size=sizes[0])
+    for t, (p, s) in enumerate(zip(positions[1:], sizes[1:]), start=start + 1):
+        test_object.update_position(t, p, size=s)
+    return test_object
+
+
+def test_identify_disc():
+    rng = np.random.default_rng(0)
+    t = np.arange(60)
+    disc = np.column_stack([20 + 15 * t, 400 - 12 * t + 0.2 * t**2])
+    # Stationary, jittering false positive
+    noise = 300 + rng.normal(0, 1.5, size=(200, 2))
+    # Slow, erratic player
+    player = np.cumsum(rng.normal(0, 3, size=(150, 2)), axis=0) + 500
+
+    objects = OrderedDict(
+        {
+            0: make_object(noise, np.full(200, 10.0)),
+            1: make_object(player, np.full(150, 60.0)),
+            2: make_object(disc, np.full(60, 12.0), start=40),
+            3: make_object(disc[:5], np.full(5, 12.0)),
+        }
+    )
+    scores = score_objects(objects)
+
+    assert 3 not in scores
+    assert identify_disc(scores) == 2
+
+
+def test_identify_disc_no_candidates():
+    assert identify_disc({}) is None
+
+
+def test_select_disc_asks_until_valid(monkeypatch, capsys):
+    responses = iter(["", "three", "3 99", "3, 17"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(responses))
+
+    # Nothing was suggested, so an empty response isn't accepted
+    assert disc_tracker.select_disc("left", {}, False, {3: None, 17: None}) == [3, 17]
+    output = capsys.readouterr().out
+    assert "at least one id" in output
+    assert "whole numbers" in output
+    assert "No object with id 99" in output
+
+    monkeypatch.setattr("builtins.input", lambda prompt: "")
+    assert disc_tracker.select_disc("left", {3: 1.0}, False, {3: None}) == [3]
+
+
+def test_select_disc_without_input(monkeypatch):
+    def end_of_input(prompt):
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", end_of_input)
+    with pytest.raises(SystemExit, match="No disc id given"):
+        disc_tracker.select_disc("left", {}, False, {})
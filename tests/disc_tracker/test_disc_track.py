@@ -4,7 +4,10 @@ from collections import OrderedDict
 import numpy as np
 import numpy.testing as npt
 
-from disc_tracker.deprojection.disc_track import DiscTrack
+from disc_tracker.deprojection.disc_track import (
+    DiscTrack,
+    align_tracks,
+)
 from disc_tracker.video_processing.gg6 import save_disc_track
 from disc_tracker.video_processing.tracker import Object
 
@@ -34,3 +37,13 @@ def test_get_time_index():
     )
 
     npt.assert_array_equal(test_index, np.array([2, 3, 4, 5, 6, 7]))
+
+
+def test_align_tracks_keeps_sub_pixels():
+    left = (np.array([0, 2]), np.array([[640.25, 360.5], [642.25, 362.5]]))
+    right = (np.array([1, 3]), np.array([[100.75, 200.0], [102.75, 202.0]]))
+
+    test_left, test_right = align_tracks([left, right], np.array([1, 2]), [1280, 720])
+
+    npt.assert_array_equal(test_left, np.array([[1.25, 2.25], [1.5, 2.5]]))
+    npt.assert_array_equal(test_right, np.array([[-539.25, -538.25], [-160.0, -159.0]]))
@@ -0,0 +1,103 @@
+import cv2 as cv
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from disc_tracker.video_processing import gg6
+from disc_tracker.video_processing.frame_processor import (
+    FrameProcessor,
+    scaled_kernel_size,
+)
+
+
+def moving_disc_frames(n_frames=20):
+    frames = []
+    for i in range(n_frames):
+        frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+        cv.circle(frame, (40 + 10 * i, 120), 8, (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def test_scaled_kernel_size():
+    assert scaled_kernel_size(25, 1) == (25, 25)
+    assert scaled_kernel_size(25, 0.5) == (13, 13)
+    assert scaled_kernel_size(5, 0.1) == (1, 1)
+
+
+def test_detect_matches_detect_objects():
+    frame_processor = FrameProcessor()
+    background_subtractor = cv.createBackgroundSubtractorMOG2()
+    blob_detector = gg6.setup_blob_detector()
+    for frame in moving_disc_frames():
+        expected = gg6.detect_objects(background_subtractor, blob_detector, frame)
+        blobs = frame_processor.detect(frame)
+
+        npt.assert_array_equal(
+            cv.KeyPoint_convert(blobs), cv.KeyPoint_convert(expected)
+        )
+
+
+def test_detect_scaled_roi():
+    roi = np.zeros((240, 320), dtype=np.uint8)
+    roi[80:160, 100:300] = 255
+    frame_processor = FrameProcessor(scale=0.5, roi=roi, fast_close=True)
+    for frame in moving_disc_frames():
+        blobs = frame_processor.detect(frame)
+
+    # The last disc, at (230, 120), is inside the region
+    npt.assert_allclose(cv.KeyPoint_convert(blobs), [[230, 120]], atol=1)
+
+
+def test_empty_roi_raises():
+    roi = np.zeros((240, 320), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        FrameProcessor(roi=roi)
+
+
+def test_motion_gate_skips_idle_frames():
+    idle = [np.full((240, 320, 3), 40, dtype=np.uint8)] * 50
+    frames = idle + moving_disc_frames() + idle
+    frame_processor = FrameProcessor()
+    gated_processor = FrameProcessor(motion_gate=True)
+    for frame in frames:
+        blobs = frame_processor.detect(frame)
+        gated_blobs = gated_processor.detect(frame)
+
+        # The background model sees fewer frames, so may differ slightly
+        npt.assert_allclose(
+            cv.KeyPoint_convert(gated_blobs), cv.KeyPoint_convert(blobs), atol=1
+        )
+
+    assert gated_processor.frames == len(frames)
+    assert gated_processor.gated_frames >= 2 * len(idle) - 35
+    assert frame_processor.gated_frames == 0
+
+
+def test_motion_gate_fraction():
+    # Idle frames with a few flickering pixels, like sensor noise
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(60):
+        frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+        # The running average starts from a clean frame
+        for y, x in rng.integers(0, (60, 80), (3 if i > 0 else 0, 2)):
+            frame[4 * y : 4 * y + 4, 4 * x : 4 * x + 4] = 255
+        frames.append(frame)
+    tolerant = FrameProcessor(motion_gate=True, gate_fraction=1e-3)
+    sensitive = FrameProcessor(motion_gate=True, gate_fraction=1e-5)
+    for frame in frames:
+        tolerant.detect(frame)
+        sensitive.detect(frame)
+
+    # At most 3 of the 80 x 60 gated pixels change in each frame
+    assert tolerant.gate_min_pixels == 5
+    assert tolerant.gated_frames >= len(frames) - 31
+    assert sensitive.gated_frames == 0
+
+    # The fraction is of the region of interest
+    roi = np.zeros((240, 320), dtype=np.uint8)
+    roi[:, :160] = 255
+    frame_processor = FrameProcessor(motion_gate=True, roi=roi, gate_fraction=1e-3)
+    frame_processor.detect(frames[0])
+    assert frame_processor.gate_min_pixels == 2
@@ -0,0 +1,259 @@
+import threading
+
+import cv2 as cv
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from disc_tracker.video_processing import Tracker, gg6
+from disc_tracker.video_processing.detection_cache import load_detections
+
+
+def write_video(filename, n_frames=300, throw=(150, 190)):
+    """
+    Write a noisy video of an empty pitch, with a disc crossing it during `throw`.
+    """
+    writer = cv.VideoWriter(filename, cv.VideoWriter_fourcc(*"mp4v"), 30, (320, 240))
+    rng = np.random.default_rng(0)
+    for i in range(n_frames):
+        frame = np.full((240, 320, 3), 40, np.uint8)
+        frame += rng.integers(0, 5, frame.shape, dtype=np.uint8)
+        if throw[0] <= i < throw[1]:
+            s = (i - throw[0]) / (throw[1] - throw[0])
+            centre = (20 + int(280 * s), 180 - int(120 * np.sin(np.pi * s)))
+            cv.circle(frame, centre, 6, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def test_find_active_windows():
+    frame_indices = np.arange(0, 1000, 5)
+    energy = np.zeros(len(frame_indices))
+    energy[[40, 41, 42, 150]] = 0.01
+
+    windows = gg6.find_active_windows(frame_indices, energy, padding=10)
+
+    assert windows == [(185, 225), (735, 765)]
+
+
+def test_learn_roi_without_motion(tmp_path):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename, n_frames=100, throw=(0, 0))
+    assert gg6.learn_roi(cv.VideoCapture(filename)) is None
+
+    write_video(filename, n_frames=0)
+    assert gg6.learn_roi(cv.VideoCapture(filename)) is None
+
+
+def test_headless_never_displays(tmp_path, monkeypatch):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Displayed a frame without a display")
+
+    for name in ("imshow", "waitKey", "destroyAllWindows"):
+        monkeypatch.setattr(gg6.cv, name, fail)
+
+    objects = gg6.track_objects(cv.VideoCapture(filename), "left", headless=True)
+
+    assert max(len(o.track) for o in objects.values()) >= 30
+
+
+def test_annotated_video_matches_input(tmp_path):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename)
+    output_filename = str(tmp_path / "left_tracked.mp4")
+
+    gg6.track_objects(
+        cv.VideoCapture(filename),
+        "left",
+        headless=True,
+        output_filename=output_filename,
+    )
+
+    video, output = cv.VideoCapture(filename), cv.VideoCapture(output_filename)
+    for property in (
+        cv.CAP_PROP_FRAME_WIDTH,
+        cv.CAP_PROP_FRAME_HEIGHT,
+        cv.CAP_PROP_FPS,
+        cv.CAP_PROP_FRAME_COUNT,
+    ):
+        assert output.get(property) == video.get(property)
+    # Only frames with the disc, which is thrown from frame 150 to 190, are annotated
+    annotated = []
+    for i in range(int(video.get(cv.CAP_PROP_FRAME_COUNT))):
+        difference = cv.absdiff(video.read()[1], output.read()[1])
+        if (difference.max(axis=2) > 100).sum() > 20:
+            annotated.append(i)
+    assert annotated[0] >= 150 and annotated[-1] < 190
+    assert len(annotated) >= 30
+
+
+def test_two_pass_tracking(tmp_path):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename)
+
+    windows = gg6.find_active_windows(*gg6.motion_timeline(cv.VideoCapture(filename)))
+    assert len(windows) == 1
+    assert windows[0][0] <= 150 and windows[0][1] >= 190
+    assert windows[0][1] - windows[0][0] < 150
+
+    one_pass = gg6.track_objects(cv.VideoCapture(filename), "left", headless=True)
+    two_pass = gg6.track_objects(
+        cv.VideoCapture(filename), "left", headless=True, windows=windows
+    )
+
+    longest = max(one_pass.values(), key=lambda o: len(o.track)).track
+    two_pass_longest = max(two_pass.values(), key=lambda o: len(o.track)).track
+    npt.assert_array_equal(two_pass_longest[:, 2], longest[:, 2])
+    npt.assert_allclose(two_pass_longest[:, 0:2], longest[:, 0:2], atol=1)
+
+
+def test_track_segments(tmp_path):
+    (tmp_path / "video").mkdir()
+    # The throw crosses the boundary between the two segments
+    write_video(str(tmp_path / "video" / "left.mp4"), throw=(130, 190))
+
+    one_pass = gg6.track_objects(
+        cv.VideoCapture(str(tmp_path / "video" / "left.mp4")), "left", headless=True
+    )
+    segmented = gg6.track_segments(str(tmp_path), "left", 2)
+
+    longest = max(one_pass.values(), key=lambda o: len(o.track))
+    segmented_longest = max(segmented.values(), key=lambda o: len(o.track))
+    npt.assert_array_equal(segmented_longest.track[:, 2], longest.track[:, 2])
+    npt.assert_allclose(segmented_longest.track[:, 0:2], longest.track[:, 0:2], atol=1)
+    npt.assert_allclose(segmented_longest.mean_size, longest.mean_size, rtol=0.1)
+
+
+def test_track_from_cached_detections(tmp_path, monkeypatch):
+    (tmp_path / "video").mkdir()
+    write_video(str(tmp_path / "video" / "left.mp4"))
+
+    tracked = gg6.track_chanel(
+        str(tmp_path), "left", headless=True, cache_detections=True
+    )
+    (filename,) = (tmp_path / "tracks" / "cache").iterdir()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Video was tracked again")
+
+    monkeypatch.setattr(gg6, "track_objects", fail)
+    cached = gg6.track_chanel(
+        str(tmp_path), "left", headless=True, cache_detections=True
+    )
+
+    assert list(cached) == list(tracked)
+    for id, o in tracked.items():
+        npt.assert_array_equal(cached[id].track, o.track)
+        assert cached[id].mean_size == o.mean_size
+    # Retuning the tracker only needs the detections. The disc moves further than the gate between
+    # frames, so it is split into many objects.
+    gated = gg6.track_detections(
+        load_detections(str(filename)), Tracker(gate_radius=1.0)
+    )
+    assert len(gated) > len(tracked)
+
+
+def test_detection_cache_lookup(tmp_path, monkeypatch):
+    (tmp_path / "video").mkdir()
+    write_video(str(tmp_path / "video" / "left.mp4"))
+    cache = tmp_path / "tracks" / "cache"
+    gg6.track_chanel(str(tmp_path), "left", headless=True, cache_detections=True)
+    gg6.track_chanel(
+        str(tmp_path), "left", headless=True, auto_roi=True, cache_detections=True
+    )
+    # Only the latest detections are kept
+    (filename,) = cache.iterdir()
+
+    calls = []
+    track_objects = gg6.track_objects
+    monkeypatch.setattr(
+        gg6,
+        "track_objects",
+        lambda *args, **kwargs: calls.append(kwargs) or track_objects(*args, **kwargs),
+    )
+    # Writing the video needs the frames, so the cache isn't used
+    output_filename = str(tmp_path / "left_tracked.mp4")
+    gg6.track_chanel(
+        str(tmp_path),
+        "left",
+        headless=True,
+        output_filename=output_filename,
+        auto_roi=True,
+        cache_detections=True,
+    )
+    assert len(calls) == 1
+    assert cv.VideoCapture(output_filename).get(cv.CAP_PROP_FRAME_COUNT) > 0
+    assert list(cache.iterdir()) == [filename]
+
+    def fail(video):
+        raise AssertionError("Region of interest was learned again")
+
+    # The cache is found without learning the region of interest again
+    monkeypatch.setattr(gg6, "scan_motion", fail)
+    gg6.track_chanel(
+        str(tmp_path), "left", headless=True, auto_roi=True, cache_detections=True
+    )
+    assert len(calls) == 1
+
+
+def test_checkpoints_when_windows_skip_frames(tmp_path, monkeypatch):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename)
+    saved = []
+    monkeypatch.setattr(
+        gg6,
+        "save_checkpoint",
+        lambda filename, tracker, key, complete=False: saved.append(
+            (tracker.current_time, complete)
+        ),
+    )
+
+    gg6.track_objects(
+        cv.VideoCapture(filename),
+        "left",
+        headless=True,
+        checkpoint_filename=str(tmp_path / "left.checkpoint"),
+        checkpoint_interval=50,
+        windows=[(0, 20), (130, 150), (260, 300)],
+    )
+
+    # Jumping between windows passes multiples of the interval
+    assert saved == [(131, False), (261, False), (300, True)]
+
+
+def test_reader_closed_when_detection_raises(tmp_path, monkeypatch):
+    filename = str(tmp_path / "left.mp4")
+    write_video(filename)
+    threads = threading.active_count()
+
+    def detect(self, frame):
+        raise RuntimeError("Detection failed")
+
+    monkeypatch.setattr(gg6.FrameProcessor, "detect", detect)
+    with pytest.raises(RuntimeError) as error:
+        gg6.track_objects(cv.VideoCapture(filename), "left", headless=True)
+
+    # The traceback keeps the reader alive, but the decoder thread has stopped rather than
+    # waiting on a full ring
+    assert error.value.__traceback__ is not None
+    assert threading.active_count() == threads
+
+
+def test_auto_roi_and_two_pass_scan_once(tmp_path, monkeypatch):
+    (tmp_path / "video").mkdir()
+    write_video(str(tmp_path / "video" / "left.mp4"))
+    scans = []
+    scan_motion = gg6.scan_motion
+    monkeypatch.setattr(
+        gg6, "scan_motion", lambda video: scans.append(video) or scan_motion(video)
+    )
+
+    objects = gg6.track_chanel(
+        str(tmp_path), "left", headless=True, auto_roi=True, two_pass=True
+    )
+
+    assert len(scans) == 1
+    assert max(len(o.track) for o in objects.values()) >= 30
@@ -0,0 +1,25 @@
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.deprojection.metrics import flight_metrics, stack_throws
+
+
+def test_flight_metrics():
+    # A throw at constant velocity and one under constant acceleration, filmed at 10 fps
+    t = np.arange(21.0)
+    straight = np.stack([t, 3 * t / 10, 4 * t / 10, np.full_like(t, 1.0)])
+    t = np.arange(5.0, 36.0)
+    s = (t - 5) / 10
+    lob = np.stack([t, np.zeros_like(s), 10 * s, 1 + 6 * s - 2 * s**2])
+
+    throws, lengths = stack_throws([straight, lob])
+    metrics = flight_metrics(throws, lengths, frame_rate=10)
+
+    npt.assert_array_equal(lengths, [21, 31])
+    assert np.isnan(throws[0, :, 21:]).all()
+    npt.assert_allclose(metrics["speed"][0, :21], 5)
+    npt.assert_allclose(metrics["acceleration"][1, 2, 2:29], -4)
+    npt.assert_allclose(metrics["release_speed"], [5, np.hypot(10, 6 - 4 * 0.2)])
+    npt.assert_allclose(metrics["peak_height"], [1, 1 + 6 * 1.5 - 2 * 1.5**2])
+    npt.assert_allclose(metrics["distance"], [10, 30])
+    npt.assert_allclose(metrics["hang_time"], [2, 3])
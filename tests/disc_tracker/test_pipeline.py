@@ -0,0 +1,24 @@
+import pytest
+
+from disc_tracker.video_processing.pipeline import pipelined_map
+
+
+def test_pipelined_map_preserves_order():
+    results = list(pipelined_map(range(100), lambda x: x**2, queue_size=2))
+
+    assert results == [(x, x**2) for x in range(100)]
+
+
+def test_pipelined_map_stops_early():
+    results = pipelined_map(range(1000), lambda x: -x, queue_size=2)
+    for item, result in results:
+        if item == 3:
+            break
+    results.close()
+
+    assert result == -3
+
+
+def test_pipelined_map_raises_stage_error():
+    with pytest.raises(ZeroDivisionError):
+        list(pipelined_map(range(5), lambda x: 1 / (x - 2)))
@@ -0,0 +1,113 @@
+import shutil
+
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.deprojection import smoothing as smoothing_module
+from disc_tracker.deprojection.disc_track import deproject_points
+from disc_tracker.deprojection.settings import DEFAULT_SMOOTHING
+from disc_tracker.deprojection.smoothing import (
+    ballistic_fit,
+    load_disc_path,
+    smooth_path,
+)
+
+CAMERA_SETTINGS = {"resolution": [1280, 720], "f": 1000.0, "d": 4, "c": 1.8, "h": 2.8}
+SMOOTHING = {
+    **DEFAULT_SMOOTHING,
+    "median_window": 5,
+    "savgol_window": 9,
+    "min_disparity": 1.0,
+}
+
+
+def test_smooth_path_rejects_spikes():
+    t = np.arange(50, dtype=np.float64)
+    xl = 300 - 2 * t
+    xr = xl - 200 + t
+    zl = zr = -100 + 0.1 * (t - 25) ** 2
+    expected = np.stack(deproject_points(xl, xr, zl, zr, CAMERA_SETTINGS))
+    # A detection jump in one camera and a frame where the disparity vanishes
+    xl, xr = xl.copy(), xr.copy()
+    xl[10] += 80
+    xr[30] = xl[30] - 0.01
+
+    path = smooth_path(t, xl, xr, zl, zr, CAMERA_SETTINGS, SMOOTHING)
+
+    assert (
+        np.abs(np.stack(deproject_points(xl, xr, zl, zr, CAMERA_SETTINGS))).max() > 1e5
+    )
+    npt.assert_allclose(path, expected, rtol=0.01)
+
+
+def test_smoothing_is_off_by_default():
+    t = np.arange(20, dtype=np.float64)
+    xl, xr, zl, zr = np.random.default_rng(0).uniform(-300, 300, (4, 20))
+
+    npt.assert_array_equal(
+        smooth_path(t, xl, xr, zl, zr, CAMERA_SETTINGS, DEFAULT_SMOOTHING),
+        np.stack(deproject_points(xl, xr, zl, zr, CAMERA_SETTINGS)),
+    )
+
+
+def test_calibrated_rig_skips_disparity_check(monkeypatch):
+    monkeypatch.setattr(
+        smoothing_module, "deproject_points", lambda *args: np.stack(args[:3])
+    )
+    t = np.arange(20, dtype=np.float64)
+    # Toed-in cameras can see a point with negative raw disparity
+    xl = np.linspace(-100, 100, 20)
+    xr = xl + 50
+    camera_settings = {**CAMERA_SETTINGS, "calibration": {}}
+
+    path = smooth_path(t, xl, xr, xl, xr, camera_settings, SMOOTHING)
+
+    npt.assert_allclose(path, np.stack([xl, xr, xl]))
+
+
+def test_min_disparity_above_every_frame(capsys):
+    t = np.arange(20, dtype=np.float64)
+    xl = np.linspace(-100, 100, 20)
+    xr = xl - 50
+    smoothing = {**DEFAULT_SMOOTHING, "min_disparity": 100.0}
+
+    path = smooth_path(t, xl, xr, xl, xr, CAMERA_SETTINGS, smoothing)
+
+    npt.assert_allclose(
+        path, np.stack(deproject_points(xl, xr, xl, xr, CAMERA_SETTINGS))
+    )
+    output = capsys.readouterr().out
+    assert "min_disparity" in output and "smoothing.yaml" in output
+
+
+def test_ballistic_fit():
+    t = np.arange(10, 40, dtype=np.float64)
+    path = np.stack([0.5 * t, 20 - 0.3 * t, 1 + 0.2 * t - 0.005 * t**2])
+    noise = np.random.default_rng(0).normal(0, 0.05, path.shape)
+
+    npt.assert_allclose(ballistic_fit(t, path + noise), path, atol=0.05)
+
+
+def test_load_disc_path_is_cached(tmp_path, monkeypatch):
+    shutil.copy("data/rosie_pull/camera_settings.yaml", tmp_path)
+    shutil.copytree("data/rosie_pull/tracks", tmp_path / "tracks")
+    path = load_disc_path(str(tmp_path))
+    assert len(list((tmp_path / "tracks" / "cache").iterdir())) == 1
+
+    def fail(directory):
+        raise AssertionError("Disc path wasn't cached")
+
+    monkeypatch.setattr(smoothing_module, "DiscTrack", fail)
+    npt.assert_array_equal(load_disc_path(str(tmp_path)), path)
+
+    # Changing the settings or tracks invalidates the cache
+    (tmp_path / "smoothing.yaml").write_text("fit: ballistic\n")
+    monkeypatch.undo()
+    assert not np.array_equal(load_disc_path(str(tmp_path)), path)
+    with np.load(tmp_path / "tracks" / "left.npz") as data:
+        np.savez(
+            tmp_path / "tracks" / "left.npz", x=data["x"] + 1, y=data["y"], t=data["t"]
+        )
+    load_disc_path(str(tmp_path))
+    # Paths cached for the old inputs are removed
+    assert len(list((tmp_path / "tracks" / "cache").iterdir())) == 1
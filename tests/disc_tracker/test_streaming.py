@@ -0,0 +1,51 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from disc_tracker.deprojection.disc_track import deproject_points
+from disc_tracker.deprojection.streaming import StreamingDiscTrack
+
+CAMERA_SETTINGS = {"resolution": [1280, 720], "f": 1000.0, "d": 4, "c": 1.8, "h": 2.8}
+
+
+def test_streaming_matches_batch():
+    t_left = np.array([0, 1, 2, 4, 5, 6, 7, 9])
+    t_right = np.array([1, 2, 3, 4, 6, 7, 8])
+    left = np.column_stack([t_left, 900 - 10 * t_left, 300 + 2 * t_left])
+    right = np.column_stack([t_right, 400 - 8 * t_right, 310 + t_right])
+    samples = [("left", *row) for row in left] + [("right", *row) for row in right]
+    # Interleave the chanels as they might arrive live
+    samples.sort(key=lambda sample: sample[1])
+
+    streaming = StreamingDiscTrack(CAMERA_SETTINGS, window=4)
+    points = np.array(list(streaming.stream(samples)))
+
+    time_index = np.arange(1, 9)
+    xl, zl = (np.interp(time_index, t_left, left[:, i]) for i in (1, 2))
+    xr, zr = (np.interp(time_index, t_right, right[:, i]) for i in (1, 2))
+    expected = deproject_points(xl - 640, xr - 640, zl - 360, zr - 360, CAMERA_SETTINGS)
+    npt.assert_array_equal(points[:, 0], time_index)
+    npt.assert_allclose(points[:, 1:], np.column_stack(expected))
+
+
+def test_streaming_requires_time_order():
+    streaming = StreamingDiscTrack(CAMERA_SETTINGS)
+    streaming.push("left", 2, 0.0, 0.0)
+    with pytest.raises(ValueError):
+        streaming.push("left", 2, 1.0, 1.0)
+
+
+def test_streaming_reports_skipped_frames(capsys):
+    streaming = StreamingDiscTrack(CAMERA_SETTINGS, window=4)
+    for t in range(2):
+        streaming.push("left", t, 900.0, 300.0)
+        streaming.push("right", t, 400.0, 310.0)
+    # The left chanel runs more than the window ahead, so frames 2 to 5 drop out of it
+    for t in range(2, 10):
+        streaming.push("left", t, 900.0, 300.0)
+    points = streaming.push("right", 9, 400.0, 310.0)
+
+    npt.assert_array_equal(points[:, 0], np.arange(6, 10))
+    assert streaming.gaps == [(2, 5)]
+    output = capsys.readouterr().out
+    assert "Skipping frames 2 to 5" in output and output.count("Skipping") == 1
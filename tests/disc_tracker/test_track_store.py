@@ -0,0 +1,53 @@
+import numpy as np
+import numpy.testing as npt
+
+from disc_tracker.deprojection.disc_track import DiscTrack
+from disc_tracker.track_store import TrackStore, append_session
+
+
+def make_track(start: int, length: int) -> np.ndarray:
+    t = np.arange(start, start + length, dtype=np.float64)
+    return np.column_stack([10 * t, 20 * t, t])
+
+
+def test_track_store_append_and_load(tmp_path):
+    store = TrackStore(str(tmp_path / "season"))
+    store.append("a", "left", make_track(0, 5))
+    store.append("a", "right", make_track(2, 5))
+    store.append("b", "left", make_track(100, 3))
+    # Re-processing a session replaces its track
+    store.append("a", "left", make_track(1, 4))
+
+    store = TrackStore(str(tmp_path / "season"))
+
+    assert len(store) == 3
+    track = store.load("a", "left")
+    npt.assert_array_equal(track["t"], [1, 2, 3, 4])
+    npt.assert_array_equal(track["x"], [10, 20, 30, 40])
+    npt.assert_array_equal(store.load("a", "right", start=3, stop=5)["t"], [3, 4, 5])
+    assert store.query(chanel="left") == [("a", "left"), ("b", "left")]
+    assert store.query(start=50) == [("b", "left")]
+
+
+def test_track_store_load_then_append(tmp_path):
+    store = TrackStore(str(tmp_path / "season"))
+    store.append("a", "left", make_track(0, 5))
+    track = store.load("a", "left")
+    # An interrupted append left the t column longer, so the next append truncates it
+    with open(store.column_filename("t"), "ab") as file:
+        file.write(make_track(5, 3)[:, 2].tobytes())
+
+    store.append("b", "left", make_track(100, 3))
+
+    assert not isinstance(track["t"], np.memmap)
+    npt.assert_array_equal(track["t"], [0, 1, 2, 3, 4])
+    npt.assert_array_equal(store.load("b", "left")["t"], [100, 101, 102])
+
+
+def test_disc_track_from_store(tmp_path):
+    store = TrackStore(str(tmp_path / "season"))
+    append_session(store, "data/rosie_pull", ("left", "right"))
+
+    test_path = DiscTrack("data/rosie_pull", store=store).deproject()
+
+    npt.assert_array_equal(test_path, DiscTrack("data/rosie_pull").deproject())
@@ -1,7 +1,7 @@
 import numpy as np
 import numpy.testing as npt
 
-from disc_tracker.video_processing.tracker import Tracker, Object
+from disc_tracker.video_processing.tracker import Tracker, Object, gated_assignment
 
 
 class TestObject:
@@ -20,6 +20,37 @@ class TestObject:
             test_object.track, np.array([[1.0, 2.0, 0], [3.0, 4.0, 1]])
         )
 
+    def test_update_position_beyond_capacity(self):
+        test_object = Object(0, np.array([0.0, 0.0]), capacity=1)
+        for t in range(1, 5):
+            test_object.update_position(t, np.array([t, 2.0 * t]))
+
+        assert test_object.track.shape == (5, 3)
+        assert test_object.track.base is not None
+        npt.assert_array_equal(test_object.track[:, 2], np.arange(5))
+        npt.assert_array_equal(test_object.position, np.array([4.0, 8.0, 4]))
+
+
+def test_gated_assignment():
+    rng = np.random.default_rng(0)
+    old_position = rng.uniform(0, 1000, size=(200, 2))
+    shuffle = rng.permutation(200)
+    new_position = old_position[shuffle] + rng.normal(0, 1, size=(200, 2))
+
+    row, col = gated_assignment(old_position, new_position, gate_radius=10)
+
+    assert row.size == 200
+    npt.assert_array_equal(shuffle[col], row)
+
+
+def test_gated_assignment_no_candidates():
+    row, col = gated_assignment(
+        np.array([[0.0, 0.0]]), np.array([[100.0, 100.0]]), gate_radius=10
+    )
+
+    assert row.size == 0
+    assert col.size == 0
+
 
 class TestTracker:
     def test_register(self):
@@ -127,3 +158,56 @@ class TestTracker:
         test_tracker.update(np.array([[]]))
         test_tracker.update(np.array([[]]))
         assert len(test_tracker.objects) == 0
+
+    def test_register_many(self):
+        test_tracker = Tracker()
+        test_tracker.register(np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]))
+        test_tracker.deregister(np.array([0, 2]))
+
+        assert [*test_tracker.objects] == [1]
+        npt.assert_array_equal(test_tracker.ids, np.array([1]))
+        npt.assert_array_equal(test_tracker.positions, np.array([[3.0, 4.0]]))
+        assert test_tracker.disappeared == {1: 0}
+        assert test_tracker.next_id == 3
+
+    def test_update_gated_new_object(self):
+        test_tracker = Tracker(gate_radius=5)
+        test_tracker.update(np.array([[1.0, 2.0], [3.0, 4.0]]))
+        test_tracker.update(np.array([[3.1, 4.1], [50.0, 50.0]]))
+
+        assert len(test_tracker.objects) == 3
+        assert test_tracker.disappeared == {0: 1, 1: 0, 2: 0}
+        npt.assert_array_equal(
+            test_tracker.objects[2].position, np.array([50.0, 50.0, 1])
+        )
+
+    def test_update_predict_motion_crossing_objects(self):
+        positions = [
+            np.array([[0.0, 0.0], [50.0, 3.0]]),
+            np.array([[20.0, 0.0], [30.0, 3.0]]),
+            np.array([[40.0, 0.0], [10.0, 3.0]]),
+        ]
+        static_tracker = Tracker()
+        predicting_tracker = Tracker(predict_motion=True)
+        for p in positions:
+            static_tracker.update(p)
+            predicting_tracker.update(p)
+
+        # Matching on last position swaps the ids as the objects cross
+        npt.assert_array_equal(static_tracker.objects[0].track[:, 0], [0, 20, 10])
+        npt.assert_array_equal(predicting_tracker.objects[0].track[:, 0], [0, 20, 40])
+        npt.assert_array_equal(predicting_tracker.objects[1].track[:, 0], [50, 30, 10])
+
+    def test_advance_to(self):
+        test_tracker = Tracker(max_disappeared=10)
+        test_tracker.update(np.array([[1.0, 2.0]]))
+        test_tracker.advance_to(5)
+        test_tracker.update(np.array([[1.1, 2.1]]))
+
+        assert test_tracker.current_time == 6
+        npt.assert_array_equal(
+            test_tracker.objects[0].track, np.array([[1.0, 2.0, 0], [1.1, 2.1, 5]])
+        )
+
+        test_tracker.advance_to(20)
+        assert len(test_tracker.objects) == 0
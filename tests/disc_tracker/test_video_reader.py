@@ -0,0 +1,70 @@
+import threading
+
+import cv2 as cv
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from disc_tracker.video_processing.video_reader import VideoReader
+
+
+def write_video(filename, n_frames=30):
+    """
+    Write a video whose frames get brighter, so each can be recognised.
+    """
+    writer = cv.VideoWriter(filename, cv.VideoWriter_fourcc(*"mp4v"), 25, (64, 48))
+    for i in range(n_frames):
+        writer.write(np.full((48, 64, 3), 8 * i, np.uint8))
+    writer.release()
+
+
+def test_video_reader_matches_read(tmp_path):
+    filename = str(tmp_path / "video.mp4")
+    write_video(filename)
+    video = cv.VideoCapture(filename)
+    expected = []
+    while (frame := video.read()[1]) is not None:
+        expected.append(frame)
+
+    reader = VideoReader(cv.VideoCapture(filename), buffer_size=3)
+    items = [(i, t, frame.copy()) for i, t, frame in reader]
+
+    assert [i for i, _, _ in items] == list(range(len(expected)))
+    npt.assert_allclose([t for _, t, _ in items], np.arange(len(expected)) * 40)
+    for (_, _, frame), expected_frame in zip(items, expected):
+        npt.assert_array_equal(frame, expected_frame)
+
+
+@pytest.mark.parametrize("keep", [1, 2])
+def test_video_reader_reuses_frames(tmp_path, keep):
+    filename = str(tmp_path / "video.mp4")
+    write_video(filename)
+    reader = VideoReader(cv.VideoCapture(filename), buffer_size=keep + 1, keep=keep)
+
+    kept = []
+    arrays = set()
+    for i, _, frame in reader:
+        arrays.add(id(frame))
+        kept = (kept + [(i, frame, frame.copy())])[-keep:]
+        # Give the decoder time to overwrite anything it shouldn't
+        threading.Event().wait(0.005)
+        for _, array, copy in kept:
+            npt.assert_array_equal(array, copy)
+
+    assert len(arrays) == keep + 1
+    # The consumer is slower, so the decoder had to wait for it
+    assert reader.decode_stalls > 0
+
+
+def test_video_reader_stops_early(tmp_path):
+    filename = str(tmp_path / "video.mp4")
+    write_video(filename)
+    threads = threading.active_count()
+
+    reading = iter(VideoReader(cv.VideoCapture(filename)))
+    for i, _, _ in reading:
+        if i == 3:
+            break
+    reading.close()
+
+    assert threading.active_count() == threads